@@ -4,21 +4,23 @@ Reference Architecture Generator - FastAPI Application
 This API generates healthcare-specific Claude deployment architectures.
 """
 
+import atexit
+import itertools
+import json
 import logging
 import os
+import queue
+import secrets
 import time
-import uuid
 from contextlib import asynccontextmanager
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
 
-from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+from fastapi.responses import ORJSONResponse
 from sse_starlette.sse import EventSourceResponse
 import anthropic
+import orjson
 
 from app.models import (
     ArchitectureRequest,
@@ -26,23 +28,117 @@ from app.models import (
     CodeGenerationRequest,
     CodeGenerationResponse,
 )
-from app.services.generator import ArchitectureGenerator
+from app.config import get_settings
+from app.rate_limit import TokenBucketLimiter
+from app.services.generator import ArchitectureGenerator, encode_sse_event
 
-# Configure logging with structured format for audit trail
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+LOG_QUEUE_SIZE = 10_000  # Pending log records before new ones are dropped
+
+# Standard LogRecord attributes; anything else on a record came from `extra=`
+_LOG_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": record.created,
+            "lvl": record.levelname,
+            "name": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _LOG_RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queue records so the listener thread does the JSON formatting and writes.
+
+    The message and any traceback are rendered before queueing, so args mutated
+    after the log call can't change the line and exc_info frames aren't kept
+    alive until the listener gets to the record. Records are dropped rather
+    than blocking the event loop when the queue is full; the count is reported
+    as a warning once the queue has room again.
+    """
+
+    _exc_formatter = logging.Formatter()
+
+    def __init__(self, record_queue: queue.Queue):
+        super().__init__(record_queue)
+        self.dropped = 0  # Total records dropped because the queue was full
+        self._unreported = 0  # Dropped since the last warning was queued
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Snapshot on the caller's thread; the JSON formatting stays deferred
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+            return
+        if self._unreported:
+            try:
+                self.queue.put_nowait(self.drop_report())
+            except queue.Full:
+                return
+            self._unreported = 0
+
+    def drop_report(self) -> logging.LogRecord:
+        """Build the warning counting records dropped since the last report."""
+        return logging.makeLogRecord({
+            "name": __name__,
+            "levelno": logging.WARNING,
+            "levelname": "WARNING",
+            "msg": f"Log queue full; dropped {self._unreported} log records",
+        })
+
+
+# Configure logging with structured JSON for the audit trail. Records go through
+# a queue so formatting and stream writes happen on a listener thread, not the event loop.
+log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(JsonFormatter())
+_queue_handler = DeferredQueueHandler(log_queue)
+log_listener = QueueListener(log_queue, _log_handler)
+log_listener.start()
+
+
+def _stop_logging() -> None:
+    """Flush queued records at exit, reporting drops the queue never had room for."""
+    log_listener.stop()
+    if _queue_handler._unreported:
+        _log_handler.handle(_queue_handler.drop_report())
+
+
+atexit.register(_stop_logging)
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
+settings = get_settings()
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Rate limiters: 10 requests per minute per IP, tracked separately per endpoint
+architecture_limiter = TokenBucketLimiter(capacity=10, period=60.0)
+stream_limiter = TokenBucketLimiter(capacity=10, period=60.0)
+code_limiter = TokenBucketLimiter(capacity=10, period=60.0)
 
-# Initialize the generator (will be set up in lifespan)
-generator: Optional[ArchitectureGenerator] = None
+def parse_cors_origins(raw: str) -> list[str]:
+    """Split a comma-separated origin list, dropping blanks."""
+    return [origin for origin in map(str.strip, raw.split(",")) if origin]
 
 
 def validate_api_key(api_key: str) -> None:
@@ -58,17 +154,14 @@ def validate_api_key(api_key: str) -> None:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize and cleanup application resources."""
-    global generator
-
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    validate_api_key(api_key)
+    validate_api_key(settings.anthropic_api_key)
     logger.info("API key validated successfully")
 
-    generator = ArchitectureGenerator(api_key)
+    # Startup fails above if the key is unusable, so handlers can rely on this
+    app.state.generator = ArchitectureGenerator(settings.anthropic_api_key, model=settings.anthropic_model)
     logger.info("Architecture generator initialized")
     yield
-    # Cleanup if needed
-    generator = None
+    await app.state.generator.aclose()
     logger.info("Application shutdown complete")
 
 
@@ -78,15 +171,11 @@ app = FastAPI(
     description="Generate healthcare-specific Claude deployment architectures",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
-# Add rate limiter to app state and register error handler
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 # Configure CORS with security check
-cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:5173").split(",")
-cors_origins = [origin.strip() for origin in cors_origins if origin.strip()]
+cors_origins = parse_cors_origins(settings.cors_origins)
 
 # Security: Prevent wildcard with credentials (CORS vulnerability)
 has_wildcard = "*" in cors_origins
@@ -99,51 +188,109 @@ app.add_middleware(
     allow_credentials=not has_wildcard,  # Disable credentials if wildcard present
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization"],
+    max_age=86400,  # Let browsers cache preflight results for a day
 )
 
 
-# Security headers middleware
-@app.middleware("http")
-async def add_security_headers(request: Request, call_next):
-    response = await call_next(request)
+# Security headers added to every response, pre-encoded for the raw ASGI message
+SECURITY_HEADERS: tuple[tuple[bytes, bytes], ...] = (
     # HTTPS enforcement
-    response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+    (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
     # Content Security Policy
-    response.headers["Content-Security-Policy"] = "default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline'; img-src 'self' data:;"
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "DENY"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    return response
+    (b"content-security-policy", b"default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline'; img-src 'self' data:;"),
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"1; mode=block"),
+)
+
+
+# Request IDs only correlate log lines: a random per-process prefix plus a counter
+REQUEST_ID_PREFIX = secrets.token_hex(3)
+_next_request_number = itertools.count().__next__
+
 
+def _reset_request_ids() -> None:
+    """Give a forked worker its own request ID prefix and counter.
 
-# Audit logging middleware
-@app.middleware("http")
-async def audit_log(request: Request, call_next):
-    request_id = str(uuid.uuid4())
-    start_time = time.time()
+    Workers forked from a preloaded app (gunicorn --preload) would otherwise
+    inherit the parent's prefix and counter and issue colliding IDs.
+    """
+    global REQUEST_ID_PREFIX, _next_request_number
+    REQUEST_ID_PREFIX = secrets.token_hex(3)
+    _next_request_number = itertools.count().__next__
+
+
+# Fork hooks are POSIX-only; Windows workers are spawned and import the app afresh
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_request_ids)
+
+
+class SecurityAuditMiddleware:
+    """Pure ASGI middleware adding security headers and an audit log per request.
+
+    Works on the raw send channel instead of BaseHTTPMiddleware, so requests
+    don't pay for an extra task group and Request/Response wrapping.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    # Log request
-    client_ip = request.client.host if request.client else "unknown"
-    logger.info(f"[{request_id}] Request: {request.method} {request.url.path} from {client_ip}")
+        request_id = f"{REQUEST_ID_PREFIX}{_next_request_number():x}"
+        start_time = time.perf_counter()
 
-    response = await call_next(request)
+        # Log request
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        logger.info(
+            "request",
+            extra={"rid": request_id, "method": scope["method"], "path": scope["path"], "ip": client_ip},
+        )
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                # Log response
+                logger.info(
+                    "response",
+                    extra={
+                        "rid": request_id,
+                        "status": message["status"],
+                        "duration_ms": round((time.perf_counter() - start_time) * 1000, 2),
+                    },
+                )
+                # Build a new list: the original may be a Response's own raw_headers
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    *SECURITY_HEADERS,
+                    (b"x-request-id", request_id.encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+app.add_middleware(SecurityAuditMiddleware)
 
-    # Log response
-    duration_ms = (time.time() - start_time) * 1000
-    logger.info(f"[{request_id}] Response: {response.status_code} in {duration_ms:.2f}ms")
 
-    response.headers["X-Request-ID"] = request_id
-    return response
+# Constant health payload, serialized once
+HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "gsi-architecture-generator"})
 
 
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "gsi-architecture-generator"}
+    return Response(content=HEALTH_BODY, media_type="application/json")
 
 
-@app.post("/api/generate-architecture", response_model=ArchitectureResponse)
-@limiter.limit("10/minute")  # Rate limit: 10 requests per minute per IP
+@app.post(
+    "/api/generate-architecture",
+    response_model=ArchitectureResponse,
+    dependencies=[Depends(architecture_limiter)],
+)
 async def generate_architecture(request: Request, arch_request: ArchitectureRequest):
     """
     Generate a reference architecture based on the provided configuration.
@@ -157,15 +304,14 @@ async def generate_architecture(request: Request, arch_request: ArchitectureRequ
 
     Rate limited to 10 requests per minute per IP address.
     """
-    if generator is None:
-        logger.error("Generator not initialized when handling request")
-        raise HTTPException(status_code=503, detail="Service not initialized")
+    generator: ArchitectureGenerator = request.app.state.generator
 
     try:
-        logger.info(f"Generating architecture for use_case={arch_request.use_case}, platform={arch_request.cloud_platform}")
+        logger.info("Generating architecture for use_case=%s, platform=%s", arch_request.use_case, arch_request.cloud_platform)
         response = await generator.generate(arch_request)
         logger.info("Architecture generation completed successfully")
-        return response
+        # Serialize in pydantic-core rather than FastAPI's jsonable_encoder + json.dumps
+        return Response(content=response.model_dump_json(by_alias=True), media_type="application/json")
     except ValueError as e:
         # Sanitize validation errors - only show safe messages
         error_msg = str(e)
@@ -177,7 +323,7 @@ async def generate_architecture(request: Request, arch_request: ArchitectureRequ
         ]
         if not any(msg in error_msg for msg in safe_messages):
             error_msg = "Invalid request parameters"
-        logger.warning(f"Validation error: {e}")
+        logger.warning("Validation error: %s", e)
         raise HTTPException(status_code=400, detail=error_msg)
     except anthropic.APIConnectionError:
         logger.error("API Connection Error")
@@ -189,7 +335,7 @@ async def generate_architecture(request: Request, arch_request: ArchitectureRequ
         logger.warning("Anthropic rate limit exceeded")
         raise HTTPException(status_code=429, detail="Service busy. Please try again later.")
     except anthropic.APIStatusError as e:
-        logger.error(f"API Status Error: {e.status_code}")
+        logger.error("API Status Error: %s", e.status_code)
         raise HTTPException(status_code=500, detail="Failed to generate architecture.")
     except Exception:
         logger.exception("Unexpected error during generation")
@@ -199,8 +345,10 @@ async def generate_architecture(request: Request, arch_request: ArchitectureRequ
         )
 
 
-@app.post("/api/generate-architecture-stream")
-@limiter.limit("10/minute")
+STREAM_FAILED_EVENT = encode_sse_event("error", b'{"error": "Failed to generate architecture"}')
+
+
+@app.post("/api/generate-architecture-stream", dependencies=[Depends(stream_limiter)])
 async def generate_architecture_stream(request: Request, arch_request: ArchitectureRequest):
     """
     Stream architecture generation with Server-Sent Events.
@@ -212,11 +360,9 @@ async def generate_architecture_stream(request: Request, arch_request: Architect
 
     Note: Sample code is NOT included - use /api/generate-code separately.
     """
-    if generator is None:
-        logger.error("Generator not initialized when handling streaming request")
-        raise HTTPException(status_code=503, detail="Service not initialized")
+    generator: ArchitectureGenerator = request.app.state.generator
 
-    logger.info(f"Starting streaming generation for use_case={arch_request.use_case}, platform={arch_request.cloud_platform}")
+    logger.info("Starting streaming generation for use_case=%s, platform=%s", arch_request.use_case, arch_request.cloud_platform)
 
     async def event_generator():
         try:
@@ -224,7 +370,7 @@ async def generate_architecture_stream(request: Request, arch_request: Architect
                 yield event
         except Exception as e:
             logger.exception("Error during streaming generation")
-            yield {"event": "error", "data": '{"error": "Failed to generate architecture"}'}
+            yield STREAM_FAILED_EVENT
 
     return EventSourceResponse(
         event_generator(),
@@ -235,8 +381,11 @@ async def generate_architecture_stream(request: Request, arch_request: Architect
     )
 
 
-@app.post("/api/generate-code", response_model=CodeGenerationResponse)
-@limiter.limit("10/minute")
+@app.post(
+    "/api/generate-code",
+    response_model=CodeGenerationResponse,
+    dependencies=[Depends(code_limiter)],
+)
 async def generate_code(request: Request, code_request: CodeGenerationRequest):
     """
     Generate sample integration code on demand.
@@ -244,17 +393,15 @@ async def generate_code(request: Request, code_request: CodeGenerationRequest):
     Call this after receiving the architecture to get Python and TypeScript
     integration examples tailored to your configuration.
     """
-    if generator is None:
-        logger.error("Generator not initialized when handling code request")
-        raise HTTPException(status_code=503, detail="Service not initialized")
+    generator: ArchitectureGenerator = request.app.state.generator
 
     try:
-        logger.info(f"Generating code for use_case={code_request.use_case}, platform={code_request.cloud_platform}")
+        logger.info("Generating code for use_case=%s, platform=%s", code_request.use_case, code_request.cloud_platform)
         response = await generator.generate_code(code_request)
         logger.info("Code generation completed successfully")
-        return response
+        return Response(content=response.model_dump_json(by_alias=True), media_type="application/json")
     except ValueError as e:
-        logger.warning(f"Code generation validation error: {e}")
+        logger.warning("Code generation validation error: %s", e)
         raise HTTPException(status_code=400, detail="Invalid response format from AI model")
     except anthropic.APIConnectionError:
         logger.error("API Connection Error during code generation")
@@ -4,7 +4,7 @@ Pydantic models for API request/response validation.
 
 from enum import Enum
 from typing import Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # Request enums
@@ -49,8 +49,7 @@ class ArchitectureRequest(BaseModel):
     data_classification: DataClassification = Field(alias="dataClassification")
     scale_tier: ScaleTier = Field(alias="scaleTier")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 # Response models
@@ -62,8 +61,7 @@ class ArchitectureComponent(BaseModel):
     purpose: str
     phi_touchpoint: bool = Field(alias="phiTouchpoint")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class DataFlow(BaseModel):
@@ -74,8 +72,7 @@ class DataFlow(BaseModel):
     data: str
     encrypted: bool
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class ComplianceItem(BaseModel):
@@ -94,8 +91,7 @@ class Architecture(BaseModel):
     components: list[ArchitectureComponent]
     data_flows: list[DataFlow] = Field(alias="dataFlows")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class Compliance(BaseModel):
@@ -104,8 +100,7 @@ class Compliance(BaseModel):
     checklist: list[ComplianceItem]
     baa_requirements: str = Field(alias="baaRequirements")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class Deployment(BaseModel):
@@ -116,8 +111,7 @@ class Deployment(BaseModel):
     network_config: str = Field(alias="networkConfig")
     monitoring_setup: str = Field(alias="monitoringSetup")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class SampleCode(BaseModel):
@@ -135,9 +129,7 @@ class ArchitectureResponse(BaseModel):
     deployment: Deployment
     sample_code: SampleCode = Field(alias="sampleCode")
 
-    class Config:
-        populate_by_name = True
-        by_alias = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 # Code generation models
@@ -148,8 +140,7 @@ class CodeGenerationRequest(BaseModel):
     cloud_platform: CloudPlatform = Field(alias="cloudPlatform")
     architecture_summary: str = Field(alias="architectureSummary")
 
-    class Config:
-        populate_by_name = True
+    model_config = ConfigDict(populate_by_name=True)
 
 
 class CodeGenerationResponse(BaseModel):
@@ -157,6 +148,4 @@ class CodeGenerationResponse(BaseModel):
 
     sample_code: SampleCode = Field(alias="sampleCode")
 
-    class Config:
-        populate_by_name = True
-        by_alias = True
+    model_config = ConfigDict(populate_by_name=True)
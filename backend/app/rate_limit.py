@@ -0,0 +1,57 @@
+"""
+Per-IP rate limiting for the generation endpoints.
+
+In-memory token buckets, so limits reset when the process restarts.
+"""
+
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request
+
+MAX_TRACKED_CLIENTS = 10_000  # Bound memory under scan traffic
+
+
+class TokenBucketLimiter:
+    """FastAPI dependency allowing `capacity` requests per `period` seconds per IP.
+
+    Buckets refill continuously, so a client may burst up to `capacity`
+    requests and then gets one more every `period / capacity` seconds.
+    Dependencies run on the event loop thread, so no lock is needed.
+    """
+
+    def __init__(
+        self, capacity: int, period: float, max_clients: int = MAX_TRACKED_CLIENTS
+    ):
+        self.capacity = float(capacity)
+        self.rate = capacity / period
+        self.max_clients = max_clients
+        # client IP -> (tokens, last refill time), least recently seen first
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def hit(self, key: str) -> bool:
+        """Take a token for `key`, returning False if its bucket is empty."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = self.capacity
+            if len(self._buckets) >= self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            tokens, last = bucket
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+            self._buckets.move_to_end(key)
+
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        self._buckets[key] = (tokens, now)
+        return allowed
+
+    async def __call__(self, request: Request) -> None:
+        client_ip = request.client.host if request.client else "127.0.0.1"
+        if not self.hit(client_ip):
+            raise HTTPException(
+                status_code=429,
+                detail="Rate limit exceeded. Please wait before making another request.",
+            )
@@ -4,15 +4,20 @@ Architecture Generator Service
 Integrates with Claude API to generate healthcare reference architectures.
 """
 
-import json
+import asyncio
+import functools
 import logging
-import os
 import re
+from collections import OrderedDict
 from pathlib import Path
 from typing import AsyncGenerator, Optional
 
 import anthropic
+import httpx
+import orjson
+from pydantic import TypeAdapter, ValidationError
 
+from app.config import get_settings
 from app.models import (
     ArchitectureRequest,
     ArchitectureResponse,
@@ -26,44 +31,53 @@ logger = logging.getLogger(__name__)
 
 # Constants
 MAX_RESPONSE_SIZE = 500_000  # 500KB limit for Claude responses
+# Keep idle connections to the API alive between requests (httpx default is 5s)
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0)
+# 120s between response chunks, but give up quickly if the API is unreachable
+HTTP_TIMEOUT = httpx.Timeout(120.0, connect=5.0)
+GENERATE_MANY_CONCURRENCY = 10  # Default parallel calls for generate_many
+BATCH_POLL_INTERVAL = 30.0  # Seconds between Message Batch status checks
+RESPONSE_CACHE_SIZE = 512  # Holds every request combination (288) with headroom
+REQUIRED_KEYS = frozenset(("architecture", "compliance", "deployment", "sampleCode"))
 
+# Leading whitespace plus an optional ```lang fence, matched at the start only
+OPENING_FENCE_RE = re.compile(r"\s*(?:```[\w-]*)?\s*")
 
-class ArchitectureGenerator:
-    """Generates healthcare reference architectures using Claude."""
+# Prebuilt validators that parse and validate the raw JSON text in one pass
+ARCHITECTURE_RESPONSE_ADAPTER = TypeAdapter(ArchitectureResponse)
+CODE_RESPONSE_ADAPTER = TypeAdapter(CodeGenerationResponse)
 
-    def __init__(self, api_key: str):
-        # Add timeout to prevent hanging requests (120 seconds)
-        self.client = anthropic.Anthropic(api_key=api_key, timeout=120.0)
-        # Model configurable via env var with sensible default
-        self.model = os.getenv("ANTHROPIC_MODEL", "claude-sonnet-4-20250514")
-        self.prompts_dir = Path(__file__).parent.parent.parent / "prompts"
-        self.templates_dir = Path(__file__).parent.parent.parent / "templates"
-        
-        # Load prompts
-        self.system_prompt = self._load_prompt("system_prompt.txt")
-        self.healthcare_context = self._load_prompt("healthcare_context.txt")
-        self.aws_context = self._load_prompt("aws_bedrock_context.txt")
-        self.gcp_context = self._load_prompt("gcp_vertex_context.txt")
-        self.example_output = self._load_template("example_output.md")
+# Prompt caching matches on an exact prefix, so static prompt text lives in
+# module-level constants and is always sent ahead of per-request content.
+CACHE_CONTROL = {"type": "ephemeral"}
 
-    def _load_prompt(self, filename: str) -> str:
-        """Load a prompt file."""
-        path = self.prompts_dir / filename
-        if path.exists():
-            return path.read_text()
-        return ""
+STREAMING_SYSTEM_PROMPT = """You are an expert Healthcare IT Solutions Architect. Generate reference architectures with Mermaid diagrams, components, compliance checklists, and deployment steps in JSON format.
 
-    def _load_template(self, filename: str) -> str:
-        """Load a template file."""
-        path = self.templates_dir / filename
-        if path.exists():
-            return path.read_text()
-        return ""
+IMPORTANT: Do NOT include sampleCode in your response. Code samples will be generated separately on demand."""
 
-    def _get_use_case_context(self, use_case: UseCase) -> str:
-        """Get specific context for the use case."""
-        contexts = {
-            UseCase.CLINICAL_DOCUMENTATION: """
+STREAMING_RESPONSE_SCHEMA = """Return valid JSON with this structure (NO sampleCode - it will be generated separately):
+{
+  "architecture": {
+    "mermaidDiagram": "flowchart TD...",
+    "components": [{"name": "", "service": "", "purpose": "", "phiTouchpoint": true}],
+    "dataFlows": [{"from": "", "to": "", "data": "", "encrypted": true}]
+  },
+  "compliance": {
+    "checklist": [{"category": "technical", "requirement": "", "implementation": "", "priority": "required"}],
+    "baaRequirements": ""
+  },
+  "deployment": {
+    "steps": [],
+    "iamPolicies": [],
+    "networkConfig": "",
+    "monitoringSetup": ""
+  }
+}"""
+
+
+# Use-case specific prompt context
+USE_CASE_CONTEXTS: dict[UseCase, str] = {
+    UseCase.CLINICAL_DOCUMENTATION: """
 ## Use Case: Clinical Documentation Assistance
 
 ### Integration Points
@@ -84,7 +98,7 @@ class ArchitectureGenerator:
 - Clinician review: All AI-generated content requires human review before filing
 - Consent: May require patient notification of AI assistance
 """,
-            UseCase.PRIOR_AUTHORIZATION: """
+    UseCase.PRIOR_AUTHORIZATION: """
 ## Use Case: Prior Authorization Automation
 
 ### Integration Points
@@ -105,7 +119,7 @@ class ArchitectureGenerator:
 - Timely response: Regulatory requirements for response times
 - Decision transparency: Clear rationale for approvals/denials
 """,
-            UseCase.MEDICAL_CODING: """
+    UseCase.MEDICAL_CODING: """
 ## Use Case: Medical Coding Support
 
 ### Integration Points
@@ -126,7 +140,7 @@ class ArchitectureGenerator:
 - Upcoding prevention: Guard against inappropriate code selection
 - DRG optimization: Ensure accurate, not inflated, reimbursement
 """,
-            UseCase.PATIENT_COMMUNICATION: """
+    UseCase.PATIENT_COMMUNICATION: """
 ## Use Case: Patient Communication
 
 ### Integration Points
@@ -148,40 +162,39 @@ class ArchitectureGenerator:
 - Opt-out capability: Easy mechanism to stop communications
 - Right channel: Route sensitive information appropriately
 """,
-        }
-        return contexts.get(use_case, "")
-
-    def _get_cloud_context(self, platform: CloudPlatform) -> str:
-        """Get cloud-specific context."""
-        if platform == CloudPlatform.AWS_BEDROCK:
-            return self.aws_context
-        return self.gcp_context
-
-    def _build_user_prompt(self, request: ArchitectureRequest) -> str:
-        """Build the user prompt for Claude."""
-        use_case_context = self._get_use_case_context(request.use_case)
-        cloud_context = self._get_cloud_context(request.cloud_platform)
-
-        return f"""Generate a complete reference architecture for the following configuration:
+}
+
+# Sections emitted by generate_stream, in response order
+STREAMING_SECTIONS = ("architecture", "compliance", "deployment")
+# SSE framing, using the same \r\n separator as EventSourceResponse's pings
+SSE_DATA_PREFIX = b"\r\ndata: "
+SSE_EVENT_END = b"\r\n\r\n"
+# Characters that can change brace depth or string state in JSON
+JSON_STRUCTURE_RE = re.compile(r'[\\"{}]')
+# Opening of each streamed section, compiled once for all streams
+SECTION_KEY_RES = {name: re.compile(rf'"{name}"\s*:\s*\{{') for name in STREAMING_SECTIONS}
+# How far back to re-search for a section key that may straddle two chunks
+SECTION_KEY_LOOKBACK = 256
+
+# Per-platform prompt block, sent between the static prefix and the request
+CLOUD_PROMPT_TEMPLATE = """## Cloud Platform Context
+{cloud_context}"""
+
+# Marks the per-request slots left open in specialized prompt templates
+TEMPLATE_SLOT = "\x00"
+
+# Per-request prompt templates, filled with str.format
+USER_PROMPT_TEMPLATE = """Generate a complete reference architecture for the following configuration:
 
 ## Configuration
-- **Use Case**: {request.use_case.value}
-- **Cloud Platform**: {request.cloud_platform.value}
-- **Integration Pattern**: {request.integration_pattern.value}
-- **Data Classification**: {request.data_classification.value}
-- **Scale Tier**: {request.scale_tier.value}
-
-## Healthcare Context
-{self.healthcare_context}
+- **Use Case**: {use_case}
+- **Cloud Platform**: {cloud_platform}
+- **Integration Pattern**: {integration_pattern}
+- **Data Classification**: {data_classification}
+- **Scale Tier**: {scale_tier}
 
 {use_case_context}
 
-## Cloud Platform Context
-{cloud_context}
-
-## Example Output Format
-{self.example_output}
-
 ## Your Task
 Generate a complete architecture response in the exact JSON format shown in the example.
 The response must be valid JSON that can be parsed directly.
@@ -196,242 +209,521 @@ Focus on:
 
 Generate the JSON response now:"""
 
-    async def generate(self, request: ArchitectureRequest) -> ArchitectureResponse:
-        """Generate architecture using Claude."""
+STREAMING_USER_PROMPT_TEMPLATE = """Generate a healthcare reference architecture for:
+- Use Case: {use_case}
+- Cloud Platform: {cloud_platform}
+- Integration Pattern: {integration_pattern}
+- Data Classification: {data_classification}
+- Scale Tier: {scale_tier}
 
-        user_prompt = self._build_user_prompt(request)
-        logger.debug(f"Built prompt for use_case={request.use_case}, platform={request.cloud_platform}")
+{use_case_context}
 
-        message = self.client.messages.create(
-            model=self.model,
-            max_tokens=32768,
-            system=[{
+Return ONLY the JSON in the structure shown above, no markdown or explanation."""
+
+CODE_SYSTEM_PROMPT = """You are an expert Healthcare IT developer. Generate production-quality sample code for integrating with healthcare AI architectures. Include proper error handling, logging, and PHI compliance comments."""
+
+CODE_USER_PROMPT_TEMPLATE = """Generate production-quality sample code for a healthcare AI integration:
+
+Use Case: {use_case}
+Cloud Platform: {cloud_platform}
+Architecture Summary: {architecture_summary}
+
+Return JSON with this structure:
+{{
+  "sampleCode": {{
+    "python": "# Production Python code with error handling, logging, PHI compliance...",
+    "typescript": "// Production TypeScript code with types, error handling, PHI compliance..."
+  }}
+}}
+
+Requirements:
+- Include proper error handling and logging
+- Add PHI compliance comments where relevant
+- Use cloud-specific SDK (boto3 for AWS, google-cloud for GCP)
+- Include authentication and rate limiting
+- Follow security best practices
+
+Return ONLY the JSON, no markdown or explanation."""
+
+
+@functools.lru_cache(maxsize=None)
+def read_text_file(path: Path) -> str:
+    """Read a prompt or template file once per process, or "" if it is missing."""
+    try:
+        return path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return ""
+
+
+def encode_sse_event(event: str, data: bytes) -> bytes:
+    """Encode a Server-Sent Event; EventSourceResponse sends bytes through as-is.
+
+    `data` must be a single line, which compact orjson output always is.
+    """
+    return b"event: " + event.encode() + SSE_DATA_PREFIX + data + SSE_EVENT_END
+
+
+STREAM_STARTED_EVENT = encode_sse_event("started", orjson.dumps({"status": "generating"}))
+STREAM_DONE_EVENT = encode_sse_event("done", orjson.dumps({"status": "complete"}))
+
+
+def strip_markdown_fences(text: str) -> str:
+    """Remove surrounding whitespace and ``` fences with a single slice."""
+    start = OPENING_FENCE_RE.match(text).end()
+    end = len(text)
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    if text.endswith("```", start, end):
+        end -= 3
+        while end > start and text[end - 1].isspace():
+            end -= 1
+    return text[start:end]
+
+
+class SectionScanner:
+    """Incrementally extracts one top-level JSON object section from streamed text.
+
+    The scan position and brace/string state are kept between calls, so each
+    character of the stream is examined once rather than on every chunk.
+    """
+
+    def __init__(self, section_name: str):
+        self.section_name = section_name
+        self.done = False
+        self._key_re = SECTION_KEY_RES[section_name]
+        self._search_from = 0
+        self._start: Optional[int] = None
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+
+    def feed(self, text: str) -> Optional[dict]:
+        """Scan newly arrived text; return the section once its object closes."""
+        if self.done:
+            return None
+        if self._start is None:
+            match = self._key_re.search(text, self._search_from)
+            if not match:
+                # The key may be split across chunks, so re-check the tail next time
+                self._search_from = max(0, len(text) - SECTION_KEY_LOOKBACK)
+                return None
+            self._start = self._pos = match.end() - 1
+
+        pos = self._pos
+        while True:
+            match = JSON_STRUCTURE_RE.search(text, pos)
+            if match is None:
+                self._pos = len(text)
+                return None
+            char, i = match.group(), match.start()
+            if char == "\\":
+                if i + 1 == len(text):
+                    # Wait for the escaped character to arrive
+                    self._pos = i
+                    return None
+                pos = i + 2
+                continue
+            pos = i + 1
+            if char == '"':
+                self._in_string = not self._in_string
+            elif self._in_string:
+                continue
+            elif char == "{":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.done = True
+                    try:
+                        return orjson.loads(text[self._start:pos])
+                    except orjson.JSONDecodeError:
+                        return None
+
+
+class ArchitectureGenerator:
+    """Generates healthcare reference architectures using Claude."""
+
+    def __init__(self, api_key: str, model: Optional[str] = None):
+        # Add timeout to prevent hanging requests (see HTTP_TIMEOUT)
+        # Async client so Claude round-trips don't block the event loop
+        self.client = anthropic.AsyncAnthropic(
+            api_key=api_key,
+            timeout=HTTP_TIMEOUT,
+            http_client=anthropic.DefaultAsyncHttpxClient(limits=HTTP_LIMITS),
+        )
+        # Model configurable via ANTHROPIC_MODEL (see app.config) unless passed in
+        self.model = model or get_settings().anthropic_model
+        self.prompts_dir = Path(__file__).parent.parent.parent / "prompts"
+        self.templates_dir = Path(__file__).parent.parent.parent / "templates"
+        
+        # Load prompts
+        self.system_prompt = self._load_prompt("system_prompt.txt")
+        self.healthcare_context = self._load_prompt("healthcare_context.txt")
+        self.aws_context = self._load_prompt("aws_bedrock_context.txt")
+        self.gcp_context = self._load_prompt("gcp_vertex_context.txt")
+        self.example_output = self._load_template("example_output.md")
+        self._cloud_contexts = {
+            CloudPlatform.AWS_BEDROCK: self.aws_context,
+            CloudPlatform.GCP_VERTEX: self.gcp_context,
+        }
+
+        # Static user-prompt prefixes, sent as cached content blocks
+        self.static_prompt = self._build_static_prompt()
+        self.static_streaming_prompt = self._build_static_streaming_prompt()
+        # Per-platform context, cached as its own block after the static prefix
+        self.cloud_prompts = {platform: self._build_cloud_prompt(platform) for platform in CloudPlatform}
+        # Per-request prompts pre-filled for each (use case, platform) pair
+        self._user_prompt_templates = self._specialize_templates(USER_PROMPT_TEMPLATE)
+        self._streaming_prompt_templates = self._specialize_templates(STREAMING_USER_PROMPT_TEMPLATE)
+
+        # Validated responses keyed by request configuration (LRU order)
+        self._response_cache: OrderedDict[tuple, ArchitectureResponse] = OrderedDict()
+        # Claude calls currently running, shared by identical concurrent requests
+        self._inflight: dict[tuple, asyncio.Task] = {}
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections to the Claude API."""
+        await self.client.close()
+
+    def _load_prompt(self, filename: str) -> str:
+        """Load a prompt file."""
+        return read_text_file(self.prompts_dir / filename)
+
+    def _load_template(self, filename: str) -> str:
+        """Load a template file."""
+        return read_text_file(self.templates_dir / filename)
+
+    def _get_use_case_context(self, use_case: UseCase) -> str:
+        """Get specific context for the use case."""
+        return USE_CASE_CONTEXTS.get(use_case, "")
+
+    def _get_cloud_context(self, platform: CloudPlatform) -> str:
+        """Get cloud-specific context."""
+        return self._cloud_contexts[platform]
+
+    def _build_cloud_prompt(self, platform: CloudPlatform) -> str:
+        """Build the cloud platform context block shared by requests on that platform."""
+        return CLOUD_PROMPT_TEMPLATE.format(cloud_context=self._get_cloud_context(platform))
+
+    def _build_user_content(self, static_prompt: str, request: ArchitectureRequest, user_prompt: str) -> list[dict]:
+        """Assemble user content blocks, marking the reusable prefix blocks for caching."""
+        return [
+            {"type": "text", "text": static_prompt, "cache_control": CACHE_CONTROL},
+            {"type": "text", "text": self.cloud_prompts[request.cloud_platform], "cache_control": CACHE_CONTROL},
+            {"type": "text", "text": user_prompt},
+        ]
+
+    def _build_static_prompt(self) -> str:
+        """Build the request-independent prefix of the user prompt."""
+        return f"""## Healthcare Context
+{self.healthcare_context}
+
+## Example Output Format
+{self.example_output}"""
+
+    def _specialize_templates(self, template: str) -> dict[tuple[UseCase, CloudPlatform], tuple[str, ...]]:
+        """Pre-fill a prompt template for every (use case, platform) pair.
+
+        Each entry is the filled text split around the integration pattern,
+        data classification and scale tier slots, in that order.
+        """
+        specialized = {}
+        for use_case in UseCase:
+            for platform in CloudPlatform:
+                filled = template.format(
+                    use_case=use_case.value,
+                    cloud_platform=platform.value,
+                    use_case_context=self._get_use_case_context(use_case),
+                    integration_pattern=TEMPLATE_SLOT,
+                    data_classification=TEMPLATE_SLOT,
+                    scale_tier=TEMPLATE_SLOT,
+                )
+                parts = tuple(filled.split(TEMPLATE_SLOT))
+                if len(parts) != 4:
+                    raise ValueError("Prompt context contains the template slot marker")
+                specialized[(use_case, platform)] = parts
+        return specialized
+
+    @staticmethod
+    def _fill_template(
+        templates: dict[tuple[UseCase, CloudPlatform], tuple[str, ...]], request: ArchitectureRequest
+    ) -> str:
+        """Join the request-specific fields into a specialized template."""
+        head, after_pattern, after_classification, tail = templates[(request.use_case, request.cloud_platform)]
+        return (
+            f"{head}{request.integration_pattern.value}{after_pattern}"
+            f"{request.data_classification.value}{after_classification}{request.scale_tier.value}{tail}"
+        )
+
+    def _build_user_prompt(self, request: ArchitectureRequest) -> str:
+        """Build the per-request part of the user prompt for Claude."""
+        return self._fill_template(self._user_prompt_templates, request)
+
+    @staticmethod
+    def _cache_key(request: ArchitectureRequest) -> tuple:
+        """Build the response cache key from the request configuration."""
+        return (
+            request.use_case,
+            request.cloud_platform,
+            request.integration_pattern,
+            request.data_classification,
+            request.scale_tier,
+        )
+
+    def _cache_response(self, key: tuple, response: ArchitectureResponse) -> None:
+        """Store a validated response, evicting the least recently used entry."""
+        self._response_cache[key] = response
+        self._response_cache.move_to_end(key)
+        if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+
+    async def generate(self, request: ArchitectureRequest) -> ArchitectureResponse:
+        """Generate architecture using Claude, reusing cached responses."""
+        cache_key = self._cache_key(request)
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            self._response_cache.move_to_end(cache_key)
+            logger.debug("Cache hit for use_case=%s, platform=%s", request.use_case, request.cloud_platform)
+            return cached
+
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._generate_uncached(request, cache_key))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda done: self._forget_inflight(cache_key, done))
+        else:
+            logger.debug("Joining in-flight request for use_case=%s, platform=%s", request.use_case, request.cloud_platform)
+        # Shield so one caller going away doesn't cancel the call for the others
+        return await asyncio.shield(task)
+
+    def _forget_inflight(self, key: tuple, task: asyncio.Task) -> None:
+        """Drop a finished call from the in-flight map."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark any failure retrieved: if every caller was cancelled, nobody else
+        # awaits the shielded task and asyncio would log it as never retrieved
+        if not task.cancelled():
+            task.exception()
+
+    def _architecture_params(self, request: ArchitectureRequest) -> dict:
+        """Build the Messages API parameters for a full architecture request."""
+        user_prompt = self._build_user_prompt(request)
+        logger.debug("Built prompt for use_case=%s, platform=%s", request.use_case, request.cloud_platform)
+        return {
+            "model": self.model,
+            "max_tokens": 32768,
+            "system": [{
                 "type": "text",
                 "text": self.system_prompt,
-                "cache_control": {"type": "ephemeral"}
+                "cache_control": CACHE_CONTROL
             }],
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ],
-        )
+            "messages": [{
+                "role": "user",
+                "content": self._build_user_content(self.static_prompt, request, user_prompt),
+            }],
+        }
+
+    @staticmethod
+    def _parse_architecture_response(response_text: str) -> ArchitectureResponse:
+        """Strip fences from Claude's reply and validate it as an ArchitectureResponse."""
+        # Clean up the response if needed
+        response_text = strip_markdown_fences(response_text)
+
+        # Parse and validate JSON response
+        try:
+            return ARCHITECTURE_RESPONSE_ADAPTER.validate_json(response_text)
+        except ValidationError as e:
+            errors = e.errors()
+            if errors[0]["type"] == "json_invalid":
+                logger.error("Failed to parse Claude response as JSON: %s", e)
+                raise ValueError("Invalid response format from AI model")
+
+            # Missing top-level sections mean the model stopped short
+            missing = REQUIRED_KEYS.intersection(
+                err["loc"][0] for err in errors if err["type"] == "missing" and len(err["loc"]) == 1
+            )
+            if missing:
+                logger.error("Missing required keys in response: %s", missing)
+                raise ValueError("Incomplete response from AI model")
+            raise
+
+    async def _generate_uncached(self, request: ArchitectureRequest, cache_key: tuple) -> ArchitectureResponse:
+        """Call Claude for a configuration and cache the validated response."""
+        # Stream the response so the 120s read timeout applies between chunks
+        # rather than to the whole generation, which can exceed two minutes
+        chunks: list[str] = []
+        response_size = 0
+        async with self.client.messages.stream(**self._architecture_params(request)) as stream:
+            async for text in stream.text_stream:
+                # Validate response size as it arrives; leaving the block closes the stream
+                response_size += len(text)
+                if response_size > MAX_RESPONSE_SIZE:
+                    logger.error("Response too large: over %s bytes", MAX_RESPONSE_SIZE)
+                    raise ValueError("Response too large")
+                chunks.append(text)
+            message = await stream.get_final_message()
 
         # Check if response was truncated
         if message.stop_reason == "max_tokens":
             logger.warning("Response was truncated due to max_tokens limit")
             raise ValueError("Response exceeded maximum length. Please try a simpler configuration.")
 
-        # Extract the response text
-        response_text = message.content[0].text
-
-        # Validate response size
-        if len(response_text) > MAX_RESPONSE_SIZE:
-            logger.error(f"Response too large: {len(response_text)} bytes")
-            raise ValueError("Response too large")
+        response = self._parse_architecture_response("".join(chunks))
+        self._cache_response(cache_key, response)
+        return response
+
+    async def generate_many(
+        self,
+        requests: list[ArchitectureRequest],
+        concurrency: int = GENERATE_MANY_CONCURRENCY,
+    ) -> list[ArchitectureResponse | BaseException]:
+        """Generate architectures for many configurations concurrently.
+
+        At most `concurrency` calls are in flight at once, so size it to the
+        account's rate limit. Results are in request order, with the raised
+        exception in place of any request that failed.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def generate_one(request: ArchitectureRequest) -> ArchitectureResponse:
+            async with semaphore:
+                return await self.generate(request)
+
+        return await asyncio.gather(*(generate_one(request) for request in requests), return_exceptions=True)
+
+    async def generate_batch(
+        self,
+        requests: list[ArchitectureRequest],
+        poll_interval: float = BATCH_POLL_INTERVAL,
+    ) -> list[Optional[ArchitectureResponse]]:
+        """Generate architectures for many configurations with the Message Batches API.
+
+        Batches cost half as much as individual calls but can take up to 24
+        hours, so this is meant for offline evaluation runs, not API traffic.
+        Results are returned in request order, with None for any request that
+        failed; successful results are also added to the response cache.
+        """
+        batch = await self.client.messages.batches.create(requests=[
+            {"custom_id": str(i), "params": self._architecture_params(request)}
+            for i, request in enumerate(requests)
+        ])
+        logger.info("Submitted message batch %s with %s requests", batch.id, len(requests))
+
+        while batch.processing_status != "ended":
+            await asyncio.sleep(poll_interval)
+            batch = await self.client.messages.batches.retrieve(batch.id)
+
+        responses: list[Optional[ArchitectureResponse]] = [None] * len(requests)
+        async for entry in await self.client.messages.batches.results(batch.id):
+            index = int(entry.custom_id)
+            if entry.result.type != "succeeded":
+                logger.warning("Batch request %s did not succeed: %s", index, entry.result.type)
+                continue
 
-        # Clean up the response if needed
-        response_text = response_text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        response_text = response_text.strip()
-
-        # Parse JSON response
-        try:
-            data = json.loads(response_text)
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Claude response as JSON: {e}")
-            raise ValueError("Invalid response format from AI model")
+            message = entry.result.message
+            if message.stop_reason == "max_tokens":
+                logger.warning("Batch request %s was truncated due to max_tokens limit", index)
+                continue
+            response_text = message.content[0].text
+            if len(response_text) > MAX_RESPONSE_SIZE:
+                logger.error("Batch request %s response too large: over %s bytes", index, MAX_RESPONSE_SIZE)
+                continue
 
-        # Validate required keys exist
-        required_keys = ["architecture", "compliance", "deployment", "sampleCode"]
-        if not all(key in data for key in required_keys):
-            missing = [k for k in required_keys if k not in data]
-            logger.error(f"Missing required keys in response: {missing}")
-            raise ValueError("Incomplete response from AI model")
+            try:
+                response = self._parse_architecture_response(response_text)
+            except ValueError as e:
+                logger.warning("Batch request %s returned an invalid response: %s", index, e)
+                continue
+            responses[index] = response
+            self._cache_response(self._cache_key(requests[index]), response)
 
-        # Validate and return
-        return ArchitectureResponse.model_validate(data)
+        return responses
 
-    def _build_streaming_prompt(self, request: ArchitectureRequest) -> str:
-        """Build the user prompt for streaming (excludes sampleCode)."""
-        use_case_context = self._get_use_case_context(request.use_case)
-        cloud_context = self._get_cloud_context(request.cloud_platform)
-
-        return f"""Generate a healthcare reference architecture for:
-- Use Case: {request.use_case.value}
-- Cloud Platform: {request.cloud_platform.value}
-- Integration Pattern: {request.integration_pattern.value}
-- Data Classification: {request.data_classification.value}
-- Scale Tier: {request.scale_tier.value}
-
-## Healthcare Context
+    def _build_static_streaming_prompt(self) -> str:
+        """Build the request-independent prefix of the streaming prompt."""
+        return f"""## Healthcare Context
 {self.healthcare_context}
 
-{use_case_context}
-
-## Cloud Platform Context
-{cloud_context}
-
-Return valid JSON with this structure (NO sampleCode - it will be generated separately):
-{{
-  "architecture": {{
-    "mermaidDiagram": "flowchart TD...",
-    "components": [{{"name": "", "service": "", "purpose": "", "phiTouchpoint": true}}],
-    "dataFlows": [{{"from": "", "to": "", "data": "", "encrypted": true}}]
-  }},
-  "compliance": {{
-    "checklist": [{{"category": "technical", "requirement": "", "implementation": "", "priority": "required"}}],
-    "baaRequirements": ""
-  }},
-  "deployment": {{
-    "steps": [],
-    "iamPolicies": [],
-    "networkConfig": "",
-    "monitoringSetup": ""
-  }}
-}}
-
-Return ONLY the JSON, no markdown or explanation."""
-
-    async def generate_stream(self, request: ArchitectureRequest) -> AsyncGenerator[dict, None]:
-        """Stream architecture generation with SSE events (excludes sampleCode)."""
-        system_prompt_streaming = """You are an expert Healthcare IT Solutions Architect. Generate reference architectures with Mermaid diagrams, components, compliance checklists, and deployment steps in JSON format.
+{STREAMING_RESPONSE_SCHEMA}"""
 
-IMPORTANT: Do NOT include sampleCode in your response. Code samples will be generated separately on demand."""
+    def _build_streaming_prompt(self, request: ArchitectureRequest) -> str:
+        """Build the per-request part of the streaming prompt (excludes sampleCode)."""
+        return self._fill_template(self._streaming_prompt_templates, request)
 
+    async def generate_stream(self, request: ArchitectureRequest) -> AsyncGenerator[bytes, None]:
+        """Stream architecture generation as encoded SSE events (excludes sampleCode)."""
         user_prompt = self._build_streaming_prompt(request)
         accumulated_text = ""
-        emitted_sections = set()
+        pending_sections = [SectionScanner(name) for name in STREAMING_SECTIONS]
 
         try:
             # Send immediate "started" event so UI shows activity
-            yield {"event": "started", "data": json.dumps({"status": "generating"})}
+            yield STREAM_STARTED_EVENT
 
-            with self.client.messages.stream(
+            async with self.client.messages.stream(
                 model=self.model,
                 max_tokens=24576,
                 system=[{
                     "type": "text",
-                    "text": system_prompt_streaming,
-                    "cache_control": {"type": "ephemeral"}
+                    "text": STREAMING_SYSTEM_PROMPT,
+                    "cache_control": CACHE_CONTROL
+                }],
+                messages=[{
+                    "role": "user",
+                    "content": self._build_user_content(self.static_streaming_prompt, request, user_prompt),
                 }],
-                messages=[{"role": "user", "content": user_prompt}],
             ) as stream:
-                for text in stream.text_stream:
+                async for text in stream.text_stream:
                     accumulated_text += text
 
+                    # A section can only close on a "}", so skip chunks without one
+                    if not pending_sections or "}" not in text:
+                        continue
+
                     # Try to extract and emit completed sections
-                    for section_name in ["architecture", "compliance", "deployment"]:
-                        if section_name not in emitted_sections:
-                            section_data = self._try_extract_section(accumulated_text, section_name)
-                            if section_data is not None:
-                                emitted_sections.add(section_name)
-                                yield {
-                                    "event": "section",
-                                    "data": json.dumps({
-                                        "section": section_name,
-                                        "data": section_data
-                                    })
-                                }
+                    for scanner in list(pending_sections):
+                        section_data = scanner.feed(accumulated_text)
+                        if scanner.done:
+                            pending_sections.remove(scanner)
+                        if section_data is not None:
+                            yield encode_sse_event("section", orjson.dumps({
+                                "section": scanner.section_name,
+                                "data": section_data
+                            }))
 
             # Emit completion event
-            yield {"event": "done", "data": json.dumps({"status": "complete"})}
+            yield STREAM_DONE_EVENT
 
         except Exception as e:
-            logger.error(f"Streaming error: {e}")
-            yield {"event": "error", "data": json.dumps({"error": str(e)})}
-
-    def _try_extract_section(self, text: str, section_name: str) -> Optional[dict]:
-        """Try to extract a complete JSON section from accumulated text."""
-        pattern = rf'"{section_name}"\s*:\s*\{{'
-        match = re.search(pattern, text)
-        if not match:
-            return None
-
-        start_idx = match.end() - 1
-        brace_count = 0
-        in_string = False
-        escape_next = False
-
-        for i, char in enumerate(text[start_idx:], start_idx):
-            if escape_next:
-                escape_next = False
-                continue
-            if char == '\\':
-                escape_next = True
-                continue
-            if char == '"' and not escape_next:
-                in_string = not in_string
-                continue
-            if in_string:
-                continue
-            if char == '{':
-                brace_count += 1
-            elif char == '}':
-                brace_count -= 1
-                if brace_count == 0:
-                    section_text = text[start_idx:i + 1]
-                    try:
-                        return json.loads(section_text)
-                    except json.JSONDecodeError:
-                        return None
-
-        return None
+            logger.error("Streaming error: %s", e)
+            yield encode_sse_event("error", orjson.dumps({"error": str(e)}))
 
     async def generate_code(self, request: CodeGenerationRequest) -> CodeGenerationResponse:
         """Generate sample code based on architecture context."""
-        system_prompt_code = """You are an expert Healthcare IT developer. Generate production-quality sample code for integrating with healthcare AI architectures. Include proper error handling, logging, and PHI compliance comments."""
-
-        user_prompt = f"""Generate production-quality sample code for a healthcare AI integration:
-
-Use Case: {request.use_case.value}
-Cloud Platform: {request.cloud_platform.value}
-Architecture Summary: {request.architecture_summary}
-
-Return JSON with this structure:
-{{
-  "sampleCode": {{
-    "python": "# Production Python code with error handling, logging, PHI compliance...",
-    "typescript": "// Production TypeScript code with types, error handling, PHI compliance..."
-  }}
-}}
-
-Requirements:
-- Include proper error handling and logging
-- Add PHI compliance comments where relevant
-- Use cloud-specific SDK (boto3 for AWS, google-cloud for GCP)
-- Include authentication and rate limiting
-- Follow security best practices
-
-Return ONLY the JSON, no markdown or explanation."""
+        user_prompt = CODE_USER_PROMPT_TEMPLATE.format(
+            use_case=request.use_case.value,
+            cloud_platform=request.cloud_platform.value,
+            architecture_summary=request.architecture_summary,
+        )
 
-        message = self.client.messages.create(
+        message = await self.client.messages.create(
             model=self.model,
             max_tokens=16384,
             system=[{
                 "type": "text",
-                "text": system_prompt_code,
-                "cache_control": {"type": "ephemeral"}
+                "text": CODE_SYSTEM_PROMPT,
+                "cache_control": CACHE_CONTROL
             }],
             messages=[{"role": "user", "content": user_prompt}],
         )
 
-        response_text = message.content[0].text.strip()
-
         # Clean markdown code blocks if present
-        if response_text.startswith("```"):
-            response_text = response_text.split("\n", 1)[1]
-        if response_text.endswith("```"):
-            response_text = response_text.rsplit("```", 1)[0]
-        response_text = response_text.strip()
+        response_text = strip_markdown_fences(message.content[0].text)
 
         try:
-            data = json.loads(response_text)
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse code response as JSON: {e}")
-            raise ValueError("Invalid response format from AI model")
-
-        return CodeGenerationResponse.model_validate(data)
+            return CODE_RESPONSE_ADAPTER.validate_json(response_text)
+        except ValidationError as e:
+            if e.errors()[0]["type"] == "json_invalid":
+                logger.error("Failed to parse code response as JSON: %s", e)
+                raise ValueError("Invalid response format from AI model")
+            raise
@@ -2,11 +2,12 @@
 Pytest configuration and fixtures for GSI Architecture Generator tests.
 """
 
-import json
 import os
+from collections import namedtuple
 from itertools import product
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import orjson
 import pytest
 
 from app.models import (
@@ -16,6 +17,17 @@ from app.models import (
     ScaleTier,
     UseCase,
 )
+from app.services.generator import ArchitectureGenerator
+from tests.fixtures.mock_responses import (
+    generate_mock_architecture_json,
+    generate_mock_code_json,
+    generate_mock_streaming_json,
+)
+
+
+# Plain stand-ins for the SDK's message types; cheaper than MagicMock attributes
+MockTextBlock = namedtuple("MockTextBlock", ["text"])
+MockMessage = namedtuple("MockMessage", ["stop_reason", "content"])
 
 
 # Register markers
@@ -27,17 +39,33 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "slow: marks tests as slow (deselect with '-m \"not slow\"')"
     )
+    config.addinivalue_line(
+        "markers", "exhaustive: runs a scenario test over every combination only with --exhaustive"
+    )
+    if not config.pluginmanager.hasplugin("xdist"):
+        # pytest-xdist registers this itself; keep the mark valid without it
+        config.addinivalue_line("markers", "xdist_group(name): run grouped tests on one xdist worker")
+
+
+def pytest_addoption(parser):
+    """Register command-line options."""
+    parser.addoption(
+        "--exhaustive",
+        action="store_true",
+        default=False,
+        help="run exhaustive-marked scenario tests over all 288 combinations, not the pairwise subset",
+    )
 
 
 # Combination helpers for parametrized tests
-ALL_USE_CASES = list(UseCase)
-ALL_CLOUD_PLATFORMS = list(CloudPlatform)
-ALL_INTEGRATION_PATTERNS = list(IntegrationPattern)
-ALL_DATA_CLASSIFICATIONS = list(DataClassification)
-ALL_SCALE_TIERS = list(ScaleTier)
-
-# All 288 combinations
-ALL_SCENARIO_COMBINATIONS = list(
+ALL_USE_CASES = tuple(UseCase)
+ALL_CLOUD_PLATFORMS = tuple(CloudPlatform)
+ALL_INTEGRATION_PATTERNS = tuple(IntegrationPattern)
+ALL_DATA_CLASSIFICATIONS = tuple(DataClassification)
+ALL_SCALE_TIERS = tuple(ScaleTier)
+
+# All 288 combinations, as an immutable tuple shared by every parametrized test
+ALL_SCENARIO_COMBINATIONS: tuple[tuple, ...] = tuple(
     product(
         ALL_USE_CASES,
         ALL_CLOUD_PLATFORMS,
@@ -51,15 +79,33 @@ ALL_SCENARIO_COMBINATIONS = list(
 @pytest.fixture
 def mock_anthropic_client():
     """Create a mock Anthropic client for testing."""
-    with patch('anthropic.Anthropic') as mock:
+    with patch('anthropic.AsyncAnthropic') as mock:
         client = MagicMock()
+        # messages.create is awaited by the generator
+        client.messages.create = AsyncMock()
         mock.return_value = client
         yield client
 
 
+@pytest.fixture(scope="session")
+def shared_generator():
+    """One ArchitectureGenerator for the session, so prompts are built once."""
+    with patch('anthropic.AsyncAnthropic'):
+        return ArchitectureGenerator("sk-ant-api03-test-key")
+
+
 @pytest.fixture
+def generator(shared_generator, mock_anthropic_client, monkeypatch):
+    """The shared generator wired to this test's mock client, with empty caches."""
+    monkeypatch.setattr(shared_generator, "client", mock_anthropic_client)
+    shared_generator._response_cache.clear()
+    shared_generator._inflight.clear()
+    return shared_generator
+
+
+@pytest.fixture(scope="session")
 def sample_architecture_response():
-    """Sample valid architecture response from Claude."""
+    """Sample valid architecture response from Claude (shared; do not mutate)."""
     return {
         "architecture": {
             "mermaidDiagram": "flowchart TD\n    A[Client] --> B[API Gateway]",
@@ -104,6 +150,12 @@ def sample_architecture_response():
     }
 
 
+@pytest.fixture(scope="session")
+def sample_architecture_json(sample_architecture_response):
+    """sample_architecture_response serialized once, as Claude would return it."""
+    return orjson.dumps(sample_architecture_response).decode()
+
+
 @pytest.fixture
 def env_with_api_key():
     """Set up environment with valid API key."""
@@ -116,115 +168,105 @@ def env_with_api_key():
         os.environ.pop("ANTHROPIC_API_KEY", None)
 
 
-# Import fixtures from test_scenarios for availability across all tests
-# These are imported here so they're available to all test modules
-try:
-    from tests.fixtures.mock_responses import (
-        generate_mock_architecture_response,
-        generate_mock_code_response,
-        generate_mock_streaming_response,
-    )
-
-    @pytest.fixture
-    def mock_claude_response_factory():
-        """
-        Factory fixture that creates mock Anthropic message responses.
-        """
-
-        def _create_mock(
-            use_case: UseCase,
-            cloud_platform: CloudPlatform,
-            integration_pattern: IntegrationPattern,
-            data_classification: DataClassification,
-            scale_tier: ScaleTier,
-            include_sample_code: bool = True,
-        ) -> MagicMock:
-            if include_sample_code:
-                response_data = generate_mock_architecture_response(
-                    use_case,
-                    cloud_platform,
-                    integration_pattern,
-                    data_classification,
-                    scale_tier,
-                )
-            else:
-                response_data = generate_mock_streaming_response(
-                    use_case,
-                    cloud_platform,
-                    integration_pattern,
-                    data_classification,
-                    scale_tier,
-                )
-
-            mock_message = MagicMock()
-            mock_message.stop_reason = "end_turn"
-            mock_message.content = [MagicMock(text=json.dumps(response_data))]
-            return mock_message
-
-        return _create_mock
-
-    @pytest.fixture
-    def mock_code_response_factory():
-        """
-        Factory fixture for code generation responses.
-        """
-
-        def _create_mock(
-            use_case: UseCase,
-            cloud_platform: CloudPlatform,
-        ) -> MagicMock:
-            response_data = generate_mock_code_response(use_case, cloud_platform)
-
-            mock_message = MagicMock()
-            mock_message.stop_reason = "end_turn"
-            mock_message.content = [MagicMock(text=json.dumps(response_data))]
-            return mock_message
-
-        return _create_mock
-
-    class MockStreamContext:
-        """Mock context manager for Anthropic streaming responses."""
-
-        def __init__(self, response_text: str, chunk_size: int = 200):
-            self.response_text = response_text
-            self.chunk_size = chunk_size
-
-        def __enter__(self):
-            return self
-
-        def __exit__(self, *args):
-            pass
-
-        @property
-        def text_stream(self):
-            """Yield response in chunks to simulate streaming."""
-            for i in range(0, len(self.response_text), self.chunk_size):
-                yield self.response_text[i : i + self.chunk_size]
-
-    @pytest.fixture
-    def mock_stream_context_factory():
-        """
-        Factory fixture for creating streaming context managers.
-        """
-
-        def _create(
-            use_case: UseCase,
-            cloud_platform: CloudPlatform,
-            integration_pattern: IntegrationPattern,
-            data_classification: DataClassification,
-            scale_tier: ScaleTier,
-        ) -> MockStreamContext:
-            response_data = generate_mock_streaming_response(
+@pytest.fixture
+def mock_claude_response_factory():
+    """
+    Factory fixture that creates mock Anthropic streamed message responses.
+    """
+
+    def _create_mock(
+        use_case: UseCase,
+        cloud_platform: CloudPlatform,
+        integration_pattern: IntegrationPattern,
+        data_classification: DataClassification,
+        scale_tier: ScaleTier,
+        include_sample_code: bool = True,
+    ) -> "MockStreamContext":
+        if include_sample_code:
+            response_text = generate_mock_architecture_json(
+                use_case,
+                cloud_platform,
+                integration_pattern,
+                data_classification,
+                scale_tier,
+            )
+        else:
+            response_text = generate_mock_streaming_json(
                 use_case,
                 cloud_platform,
                 integration_pattern,
                 data_classification,
                 scale_tier,
             )
-            return MockStreamContext(json.dumps(response_data))
 
-        return _create
+        return MockStreamContext(response_text)
+
+    return _create_mock
+
+
+@pytest.fixture
+def mock_code_response_factory():
+    """
+    Factory fixture for code generation responses.
+    """
+
+    def _create_mock(
+        use_case: UseCase,
+        cloud_platform: CloudPlatform,
+    ) -> MockMessage:
+        return MockMessage("end_turn", [MockTextBlock(generate_mock_code_json(use_case, cloud_platform))])
+
+    return _create_mock
 
-except ImportError:
-    # Fixtures not available if mock_responses module doesn't exist yet
-    pass
+
+class MockStreamContext:
+    """Mock context manager for Anthropic streaming responses."""
+
+    def __init__(self, response_text: str, chunk_size: int = 200, stop_reason: str = "end_turn"):
+        self.response_text = response_text
+        self.chunk_size = chunk_size
+        self.stop_reason = stop_reason
+        # Split once so contexts reused across calls don't re-slice the text
+        self.chunks = tuple(
+            response_text[i : i + chunk_size] for i in range(0, len(response_text), chunk_size)
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    @property
+    async def text_stream(self):
+        """Yield response in chunks to simulate streaming."""
+        for chunk in self.chunks:
+            yield chunk
+
+    async def get_final_message(self) -> MockMessage:
+        """Return the accumulated message, as the SDK does once streaming ends."""
+        return MockMessage(self.stop_reason, [MockTextBlock(self.response_text)])
+
+
+@pytest.fixture
+def mock_stream_context_factory():
+    """
+    Factory fixture for creating streaming context managers.
+    """
+
+    def _create(
+        use_case: UseCase,
+        cloud_platform: CloudPlatform,
+        integration_pattern: IntegrationPattern,
+        data_classification: DataClassification,
+        scale_tier: ScaleTier,
+    ) -> MockStreamContext:
+        return MockStreamContext(generate_mock_streaming_json(
+            use_case,
+            cloud_platform,
+            integration_pattern,
+            data_classification,
+            scale_tier,
+        ))
+
+    return _create
@@ -3,9 +3,16 @@ Dynamic mock response generator for testing all scenario combinations.
 
 Generates valid mock Claude responses that vary based on input parameters,
 allowing realistic testing without actual API calls.
+
+Responses are memoized per parameter combination and shared between callers,
+so treat them as read-only.
 """
 
-from typing import Literal, TypedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Literal, TypedDict
+
+import orjson
 
 from app.models import (
     CloudPlatform,
@@ -101,38 +108,66 @@ class IntegrationInfo(TypedDict):
     description: str
 
 
+@dataclass(frozen=True, slots=True)
+class CloudServices:
+    """Service names for one cloud platform."""
+    api_gateway: str
+    ai_service: str
+    storage: str
+    database: str
+    queue: str
+    monitoring: str
+    kms: str
+    secrets: str
+    iam: str
+    vpc: str
+    functions: str
+    step_functions: str
+    eventbridge: str
+
+
 # Cloud-specific service mappings
-CLOUD_SERVICES = {
-    CloudPlatform.AWS_BEDROCK: {
-        "api_gateway": "Amazon API Gateway",
-        "ai_service": "Amazon Bedrock (Claude)",
-        "storage": "Amazon S3",
-        "database": "Amazon DynamoDB",
-        "queue": "Amazon SQS",
-        "monitoring": "Amazon CloudWatch",
-        "kms": "AWS KMS",
-        "secrets": "AWS Secrets Manager",
-        "iam": "AWS IAM",
-        "vpc": "Amazon VPC",
-        "lambda": "AWS Lambda",
-        "step_functions": "AWS Step Functions",
-        "eventbridge": "Amazon EventBridge",
-    },
-    CloudPlatform.GCP_VERTEX: {
-        "api_gateway": "Cloud Endpoints",
-        "ai_service": "Vertex AI (Claude)",
-        "storage": "Cloud Storage",
-        "database": "Cloud Firestore",
-        "queue": "Cloud Pub/Sub",
-        "monitoring": "Cloud Monitoring",
-        "kms": "Cloud KMS",
-        "secrets": "Secret Manager",
-        "iam": "Cloud IAM",
-        "vpc": "VPC Network",
-        "lambda": "Cloud Functions",
-        "step_functions": "Cloud Workflows",
-        "eventbridge": "Eventarc",
-    },
+CLOUD_SERVICES: dict[CloudPlatform, CloudServices] = {
+    CloudPlatform.AWS_BEDROCK: CloudServices(
+        api_gateway="Amazon API Gateway",
+        ai_service="Amazon Bedrock (Claude)",
+        storage="Amazon S3",
+        database="Amazon DynamoDB",
+        queue="Amazon SQS",
+        monitoring="Amazon CloudWatch",
+        kms="AWS KMS",
+        secrets="AWS Secrets Manager",
+        iam="AWS IAM",
+        vpc="Amazon VPC",
+        functions="AWS Lambda",
+        step_functions="AWS Step Functions",
+        eventbridge="Amazon EventBridge",
+    ),
+    CloudPlatform.GCP_VERTEX: CloudServices(
+        api_gateway="Cloud Endpoints",
+        ai_service="Vertex AI (Claude)",
+        storage="Cloud Storage",
+        database="Cloud Firestore",
+        queue="Cloud Pub/Sub",
+        monitoring="Cloud Monitoring",
+        kms="Cloud KMS",
+        secrets="Secret Manager",
+        iam="Cloud IAM",
+        vpc="VPC Network",
+        functions="Cloud Functions",
+        step_functions="Cloud Workflows",
+        eventbridge="Eventarc",
+    ),
+}
+
+# Vendor that signs the BAA for each platform
+CLOUD_VENDORS = {
+    CloudPlatform.AWS_BEDROCK: "AWS",
+    CloudPlatform.GCP_VERTEX: "Google Cloud",
+}
+
+BAA_REQUIREMENTS = {
+    platform: f"Sign BAA with {vendor} before processing PHI" for platform, vendor in CLOUD_VENDORS.items()
 }
 
 # Use case specific descriptions
@@ -172,6 +207,7 @@ INTEGRATION_CONFIGS = {
 }
 
 
+@lru_cache(maxsize=None)
 def generate_mock_architecture_response(
     use_case: UseCase,
     cloud_platform: CloudPlatform,
@@ -184,6 +220,29 @@ def generate_mock_architecture_response(
 
     This ensures responses are realistic while maintaining fast test execution.
     """
+    # Share the sections with the streaming response and add sampleCode
+    return {
+        **generate_mock_streaming_response(
+            use_case, cloud_platform, integration_pattern, data_classification, scale_tier
+        ),
+        "sampleCode": {
+            "python": _generate_python_code(cloud_platform, use_case),
+            "typescript": _generate_typescript_code(cloud_platform, use_case),
+        },
+    }
+
+
+@lru_cache(maxsize=None)
+def generate_mock_streaming_response(
+    use_case: UseCase,
+    cloud_platform: CloudPlatform,
+    integration_pattern: IntegrationPattern,
+    data_classification: DataClassification,
+    scale_tier: ScaleTier,
+) -> StreamingResponseDict:
+    """
+    Generate mock response for streaming endpoint (no sampleCode).
+    """
     services = CLOUD_SERVICES[cloud_platform]
     use_case_info = USE_CASE_DESCRIPTIONS[use_case]
     integration_info = INTEGRATION_CONFIGS[integration_pattern]
@@ -200,13 +259,10 @@ def generate_mock_architecture_response(
     component_count = component_counts[scale_tier]
 
     # Generate Mermaid diagram
-    mermaid_diagram = _generate_mermaid_diagram(
-        cloud_platform, integration_pattern, services
-    )
+    mermaid_diagram = _generate_mermaid_diagram(cloud_platform, integration_pattern)
 
     # Generate components based on integration pattern
     components = _generate_components(
-        cloud_platform,
         integration_pattern,
         services,
         use_case_info,
@@ -215,22 +271,16 @@ def generate_mock_architecture_response(
     )
 
     # Generate data flows
-    data_flows = _generate_data_flows(
-        cloud_platform, integration_pattern, services, use_case_info
-    )
+    data_flows = _generate_data_flows(cloud_platform, use_case)
 
     # Generate compliance checklist
-    compliance_checklist = _generate_compliance_checklist(
-        cloud_platform, data_classification, services
-    )
+    compliance_checklist = _generate_compliance_checklist(cloud_platform, data_classification)
 
     # Generate deployment steps
-    deployment_steps = _generate_deployment_steps(
-        cloud_platform, integration_pattern, scale_tier, services
-    )
+    deployment_steps = _generate_deployment_steps(cloud_platform, scale_tier)
 
     # Generate IAM policies
-    iam_policies = _generate_iam_policies(cloud_platform, integration_pattern)
+    iam_policies = _generate_iam_policies(cloud_platform)
 
     return {
         "architecture": {
@@ -240,42 +290,18 @@ def generate_mock_architecture_response(
         },
         "compliance": {
             "checklist": compliance_checklist,
-            "baaRequirements": f"Sign BAA with {'AWS' if cloud_platform == CloudPlatform.AWS_BEDROCK else 'Google Cloud'} before processing PHI",
+            "baaRequirements": BAA_REQUIREMENTS[cloud_platform],
         },
         "deployment": {
             "steps": deployment_steps,
             "iamPolicies": iam_policies,
-            "networkConfig": f"Deploy within {services['vpc']} with private subnets and NAT gateway",
-            "monitoringSetup": f"Configure {services['monitoring']} dashboards and alerts for latency, errors, and PHI access",
-        },
-        "sampleCode": {
-            "python": _generate_python_code(cloud_platform, use_case),
-            "typescript": _generate_typescript_code(cloud_platform, use_case),
+            "networkConfig": f"Deploy within {services.vpc} with private subnets and NAT gateway",
+            "monitoringSetup": f"Configure {services.monitoring} dashboards and alerts for latency, errors, and PHI access",
         },
     }
 
 
-def generate_mock_streaming_response(
-    use_case: UseCase,
-    cloud_platform: CloudPlatform,
-    integration_pattern: IntegrationPattern,
-    data_classification: DataClassification,
-    scale_tier: ScaleTier,
-) -> StreamingResponseDict:
-    """
-    Generate mock response for streaming endpoint (no sampleCode).
-    """
-    full_response = generate_mock_architecture_response(
-        use_case, cloud_platform, integration_pattern, data_classification, scale_tier
-    )
-    # Return streaming response without sampleCode
-    return StreamingResponseDict(
-        architecture=full_response["architecture"],
-        compliance=full_response["compliance"],
-        deployment=full_response["deployment"],
-    )
-
-
+@lru_cache(maxsize=None)
 def generate_mock_code_response(
     use_case: UseCase,
     cloud_platform: CloudPlatform,
@@ -289,48 +315,97 @@ def generate_mock_code_response(
     )
 
 
+@lru_cache(maxsize=None)
+def generate_mock_architecture_json(
+    use_case: UseCase,
+    cloud_platform: CloudPlatform,
+    integration_pattern: IntegrationPattern,
+    data_classification: DataClassification,
+    scale_tier: ScaleTier,
+) -> str:
+    """Mock full response as the JSON text Claude would return, encoded once."""
+    return orjson.dumps(generate_mock_architecture_response(
+        use_case, cloud_platform, integration_pattern, data_classification, scale_tier
+    )).decode()
+
+
+@lru_cache(maxsize=None)
+def generate_mock_streaming_json(
+    use_case: UseCase,
+    cloud_platform: CloudPlatform,
+    integration_pattern: IntegrationPattern,
+    data_classification: DataClassification,
+    scale_tier: ScaleTier,
+) -> str:
+    """Mock streaming response as JSON text, encoded once."""
+    return orjson.dumps(generate_mock_streaming_response(
+        use_case, cloud_platform, integration_pattern, data_classification, scale_tier
+    )).decode()
+
+
+@lru_cache(maxsize=None)
+def generate_mock_code_json(use_case: UseCase, cloud_platform: CloudPlatform) -> str:
+    """Mock code generation response as JSON text, encoded once."""
+    return orjson.dumps(generate_mock_code_response(use_case, cloud_platform)).decode()
+
+
 def _generate_mermaid_diagram(
     cloud_platform: CloudPlatform,
     integration_pattern: IntegrationPattern,
-    services: dict[str, str],
+) -> str:
+    """Look up the prebuilt Mermaid diagram for a platform and pattern."""
+    return MERMAID_DIAGRAMS[(cloud_platform, integration_pattern)]
+
+
+def _build_mermaid_diagram(
+    cloud_platform: CloudPlatform,
+    integration_pattern: IntegrationPattern,
 ) -> str:
     """Generate a valid Mermaid flowchart diagram."""
+    services = CLOUD_SERVICES[cloud_platform]
     if integration_pattern == IntegrationPattern.API_GATEWAY:
         return f"""flowchart TD
-    client[Client Application] --> apigw[{services['api_gateway']}]
+    client[Client Application] --> apigw[{services.api_gateway}]
     apigw --> auth[Authentication Service]
-    auth --> lambda[{services['lambda']}]
-    lambda --> ai[{services['ai_service']}]
+    auth --> lambda[{services.functions}]
+    lambda --> ai[{services.ai_service}]
     ai --> lambda
-    lambda --> db[({services['database']})]
+    lambda --> db[({services.database})]
     lambda --> apigw
     apigw --> client"""
 
     elif integration_pattern == IntegrationPattern.EVENT_DRIVEN:
         return f"""flowchart TD
-    producer[Event Producer] --> queue[{services['queue']}]
-    queue --> processor[{services['lambda']}]
-    processor --> ai[{services['ai_service']}]
+    producer[Event Producer] --> queue[{services.queue}]
+    queue --> processor[{services.functions}]
+    processor --> ai[{services.ai_service}]
     ai --> processor
-    processor --> storage[({services['storage']})]
-    processor --> notify[{services['eventbridge']}]
+    processor --> storage[({services.storage})]
+    processor --> notify[{services.eventbridge}]
     notify --> consumer[Event Consumer]"""
 
     else:  # BATCH_PROCESSING
         return f"""flowchart TD
-    source[({services['storage']})] --> trigger[{services['eventbridge']}]
-    trigger --> workflow[{services['step_functions']}]
-    workflow --> process[{services['lambda']}]
-    process --> ai[{services['ai_service']}]
+    source[({services.storage})] --> trigger[{services.eventbridge}]
+    trigger --> workflow[{services.step_functions}]
+    workflow --> process[{services.functions}]
+    process --> ai[{services.ai_service}]
     ai --> process
-    process --> output[({services['storage']})]
-    workflow --> monitor[{services['monitoring']}]"""
+    process --> output[({services.storage})]
+    workflow --> monitor[{services.monitoring}]"""
+
+
+# Diagrams depend only on platform and pattern, so build all six once
+MERMAID_DIAGRAMS: dict[tuple[CloudPlatform, IntegrationPattern], str] = {
+    (cloud_platform, integration_pattern): _build_mermaid_diagram(cloud_platform, integration_pattern)
+    for cloud_platform in CloudPlatform
+    for integration_pattern in IntegrationPattern
+}
 
 
 def _generate_components(
-    cloud_platform: CloudPlatform,
     integration_pattern: IntegrationPattern,
-    services: dict[str, str],
+    services: CloudServices,
     use_case_info: UseCaseInfo,
     has_phi: bool,
     component_count: int,
@@ -339,36 +414,40 @@ def _generate_components(
     base_components = [
         {
             "name": "API Gateway",
-            "service": services["api_gateway"],
+            "service": services.api_gateway,
             "purpose": f"Entry point for {use_case_info['purpose']}",
             "phiTouchpoint": False,
         },
         {
             "name": "AI Processing",
-            "service": services["ai_service"],
+            "service": services.ai_service,
             "purpose": f"Process {use_case_info['data_type']} using Claude",
             "phiTouchpoint": has_phi,
         },
         {
             "name": "Data Storage",
-            "service": services["storage"],
+            "service": services.storage,
             "purpose": f"Store {use_case_info['data_type']}",
             "phiTouchpoint": has_phi,
         },
         {
             "name": "Secrets Management",
-            "service": services["secrets"],
+            "service": services.secrets,
             "purpose": "Secure storage for API keys and credentials",
             "phiTouchpoint": False,
         },
     ]
 
+    # Smaller tiers only use the base components
+    if len(base_components) >= component_count:
+        return base_components[:component_count]
+
     # Add pattern-specific components
     if integration_pattern == IntegrationPattern.EVENT_DRIVEN:
         base_components.append(
             {
                 "name": "Message Queue",
-                "service": services["queue"],
+                "service": services.queue,
                 "purpose": "Async message processing",
                 "phiTouchpoint": has_phi,
             }
@@ -377,7 +456,7 @@ def _generate_components(
         base_components.append(
             {
                 "name": "Workflow Orchestration",
-                "service": services["step_functions"],
+                "service": services.step_functions,
                 "purpose": "Coordinate batch processing steps",
                 "phiTouchpoint": False,
             }
@@ -387,7 +466,7 @@ def _generate_components(
     base_components.append(
         {
             "name": "Monitoring",
-            "service": services["monitoring"],
+            "service": services.monitoring,
             "purpose": "Track performance and compliance metrics",
             "phiTouchpoint": False,
         }
@@ -398,56 +477,80 @@ def _generate_components(
 
 def _generate_data_flows(
     cloud_platform: CloudPlatform,
-    integration_pattern: IntegrationPattern,
-    services: dict[str, str],
-    use_case_info: UseCaseInfo,
+    use_case: UseCase,
 ) -> list[DataFlowDict]:
+    """Look up the prebuilt data flows for a platform and use case."""
+    return list(DATA_FLOWS[(cloud_platform, use_case)])
+
+
+def _build_data_flows(
+    cloud_platform: CloudPlatform,
+    use_case: UseCase,
+) -> tuple[DataFlowDict, ...]:
     """Generate data flow definitions."""
-    return [
+    services = CLOUD_SERVICES[cloud_platform]
+    use_case_info = USE_CASE_DESCRIPTIONS[use_case]
+    return (
         {
             "from": "Client",
-            "to": services["api_gateway"],
+            "to": services.api_gateway,
             "data": f"Incoming {use_case_info['data_type']}",
             "encrypted": True,
         },
         {
-            "from": services["api_gateway"],
-            "to": services["lambda"],
+            "from": services.api_gateway,
+            "to": services.functions,
             "data": "Validated request payload",
             "encrypted": True,
         },
         {
-            "from": services["lambda"],
-            "to": services["ai_service"],
+            "from": services.functions,
+            "to": services.ai_service,
             "data": "Processed prompt with context",
             "encrypted": True,
         },
         {
-            "from": services["ai_service"],
-            "to": services["lambda"],
+            "from": services.ai_service,
+            "to": services.functions,
             "data": "AI-generated response",
             "encrypted": True,
         },
         {
-            "from": services["lambda"],
-            "to": services["storage"],
+            "from": services.functions,
+            "to": services.storage,
             "data": "Audit logs and processed results",
             "encrypted": True,
         },
-    ]
+    )
+
+
+# Data flows depend only on platform and use case, so build all eight once
+DATA_FLOWS: dict[tuple[CloudPlatform, UseCase], tuple[DataFlowDict, ...]] = {
+    (cloud_platform, use_case): _build_data_flows(cloud_platform, use_case)
+    for cloud_platform in CloudPlatform
+    for use_case in UseCase
+}
 
 
 def _generate_compliance_checklist(
     cloud_platform: CloudPlatform,
     data_classification: DataClassification,
-    services: dict[str, str],
 ) -> list[ComplianceItemDict]:
+    """Look up the prebuilt compliance checklist for a platform and classification."""
+    return list(COMPLIANCE_CHECKLISTS[(cloud_platform, data_classification)])
+
+
+def _build_compliance_checklist(
+    cloud_platform: CloudPlatform,
+    data_classification: DataClassification,
+) -> tuple[ComplianceItemDict, ...]:
     """Generate HIPAA compliance checklist items."""
+    services = CLOUD_SERVICES[cloud_platform]
     items = [
         {
             "category": "technical",
             "requirement": "Encryption at rest",
-            "implementation": f"Enable {services['kms']} encryption for all data stores",
+            "implementation": f"Enable {services.kms} encryption for all data stores",
             "priority": "required",
         },
         {
@@ -459,19 +562,19 @@ def _generate_compliance_checklist(
         {
             "category": "technical",
             "requirement": "Access controls",
-            "implementation": f"Implement least-privilege {services['iam']} policies",
+            "implementation": f"Implement least-privilege {services.iam} policies",
             "priority": "required",
         },
         {
             "category": "administrative",
             "requirement": "Audit logging",
-            "implementation": f"Enable {services['monitoring']} with log retention",
+            "implementation": f"Enable {services.monitoring} with log retention",
             "priority": "required",
         },
         {
             "category": "administrative",
             "requirement": "BAA execution",
-            "implementation": f"Sign BAA with {'AWS' if cloud_platform == CloudPlatform.AWS_BEDROCK else 'Google Cloud'}",
+            "implementation": f"Sign BAA with {CLOUD_VENDORS[cloud_platform]}",
             "priority": "required",
         },
         {
@@ -492,24 +595,39 @@ def _generate_compliance_checklist(
             }
         )
 
-    return items
+    return tuple(items)
+
+
+# Checklists depend only on platform and classification, so build each once
+COMPLIANCE_CHECKLISTS: dict[tuple[CloudPlatform, DataClassification], tuple[ComplianceItemDict, ...]] = {
+    (cloud_platform, data_classification): _build_compliance_checklist(cloud_platform, data_classification)
+    for cloud_platform in CloudPlatform
+    for data_classification in DataClassification
+}
 
 
 def _generate_deployment_steps(
     cloud_platform: CloudPlatform,
-    integration_pattern: IntegrationPattern,
     scale_tier: ScaleTier,
-    services: dict[str, str],
 ) -> list[str]:
+    """Look up the prebuilt deployment steps for a platform and scale tier."""
+    return list(DEPLOYMENT_STEPS[(cloud_platform, scale_tier)])
+
+
+def _build_deployment_steps(
+    cloud_platform: CloudPlatform,
+    scale_tier: ScaleTier,
+) -> tuple[str, ...]:
     """Generate deployment steps."""
+    services = CLOUD_SERVICES[cloud_platform]
     steps = [
-        f"1. Configure {services['vpc']} with private subnets",
-        f"2. Set up {services['kms']} for encryption",
-        f"3. Create {services['secrets']} entries for API keys",
-        f"4. Deploy {services['api_gateway']} with authentication",
-        f"5. Configure {services['lambda']} with VPC access",
-        f"6. Set up {services['ai_service']} integration",
-        f"7. Enable {services['monitoring']} dashboards and alerts",
+        f"1. Configure {services.vpc} with private subnets",
+        f"2. Set up {services.kms} for encryption",
+        f"3. Create {services.secrets} entries for API keys",
+        f"4. Deploy {services.api_gateway} with authentication",
+        f"5. Configure {services.functions} with VPC access",
+        f"6. Set up {services.ai_service} integration",
+        f"7. Enable {services.monitoring} dashboards and alerts",
     ]
 
     if scale_tier == ScaleTier.ENTERPRISE:
@@ -521,34 +639,41 @@ def _generate_deployment_steps(
             ]
         )
 
-    return steps
+    return tuple(steps)
 
 
-def _generate_iam_policies(
-    cloud_platform: CloudPlatform,
-    integration_pattern: IntegrationPattern,
-) -> list[str]:
-    """Generate IAM policy definitions as JSON strings."""
-    if cloud_platform == CloudPlatform.AWS_BEDROCK:
-        return [
-            '{"Version":"2012-10-17","Statement":[{"Effect":"Allow","Action":["bedrock:InvokeModel"],"Resource":"arn:aws:bedrock:*:*:model/anthropic.*"}]}',
-            '{"Version":"2012-10-17","Statement":[{"Effect":"Allow","Action":["secretsmanager:GetSecretValue"],"Resource":"arn:aws:secretsmanager:*:*:secret:gsi/*"}]}',
-            '{"Version":"2012-10-17","Statement":[{"Effect":"Allow","Action":["logs:CreateLogGroup","logs:CreateLogStream","logs:PutLogEvents"],"Resource":"*"}]}',
-        ]
-    else:
-        return [
-            '{"bindings":[{"role":"roles/aiplatform.user","members":["serviceAccount:gsi-service@project.iam.gserviceaccount.com"]}]}',
-            '{"bindings":[{"role":"roles/secretmanager.secretAccessor","members":["serviceAccount:gsi-service@project.iam.gserviceaccount.com"]}]}',
-            '{"bindings":[{"role":"roles/logging.logWriter","members":["serviceAccount:gsi-service@project.iam.gserviceaccount.com"]}]}',
-        ]
+# Steps depend only on platform and scale tier, so build all six once
+DEPLOYMENT_STEPS: dict[tuple[CloudPlatform, ScaleTier], tuple[str, ...]] = {
+    (cloud_platform, scale_tier): _build_deployment_steps(cloud_platform, scale_tier)
+    for cloud_platform in CloudPlatform
+    for scale_tier in ScaleTier
+}
 
 
-def _generate_python_code(cloud_platform: CloudPlatform, use_case: UseCase) -> str:
-    """Generate sample Python code."""
-    use_case_label = use_case.value.replace("-", " ").title()
+# IAM policies depend only on the platform
+IAM_POLICIES: dict[CloudPlatform, tuple[str, ...]] = {
+    CloudPlatform.AWS_BEDROCK: (
+        '{"Version":"2012-10-17","Statement":[{"Effect":"Allow","Action":["bedrock:InvokeModel"],"Resource":"arn:aws:bedrock:*:*:model/anthropic.*"}]}',
+        '{"Version":"2012-10-17","Statement":[{"Effect":"Allow","Action":["secretsmanager:GetSecretValue"],"Resource":"arn:aws:secretsmanager:*:*:secret:gsi/*"}]}',
+        '{"Version":"2012-10-17","Statement":[{"Effect":"Allow","Action":["logs:CreateLogGroup","logs:CreateLogStream","logs:PutLogEvents"],"Resource":"*"}]}',
+    ),
+    CloudPlatform.GCP_VERTEX: (
+        '{"bindings":[{"role":"roles/aiplatform.user","members":["serviceAccount:gsi-service@project.iam.gserviceaccount.com"]}]}',
+        '{"bindings":[{"role":"roles/secretmanager.secretAccessor","members":["serviceAccount:gsi-service@project.iam.gserviceaccount.com"]}]}',
+        '{"bindings":[{"role":"roles/logging.logWriter","members":["serviceAccount:gsi-service@project.iam.gserviceaccount.com"]}]}',
+    ),
+}
+
+
+def _generate_iam_policies(cloud_platform: CloudPlatform) -> list[str]:
+    """Generate IAM policy definitions as JSON strings."""
+    # Copy so each response keeps JSON-shaped lists of its own
+    return list(IAM_POLICIES[cloud_platform])
 
-    if cloud_platform == CloudPlatform.AWS_BEDROCK:
-        return f'''"""
+
+def _aws_python_code(use_case_label: str) -> str:
+    """Sample Python code for AWS Bedrock."""
+    return f'''"""
 Sample Python code for {use_case_label} using AWS Bedrock.
 """
 
@@ -580,8 +705,11 @@ def invoke_claude(prompt: str) -> str:
     result = json.loads(response["body"].read())
     return result["content"][0]["text"]
 '''
-    else:
-        return f'''"""
+
+
+def _gcp_python_code(use_case_label: str) -> str:
+    """Sample Python code for GCP Vertex AI."""
+    return f'''"""
 Sample Python code for {use_case_label} using GCP Vertex AI.
 """
 
@@ -605,12 +733,22 @@ def invoke_claude(prompt: str) -> str:
 '''
 
 
-def _generate_typescript_code(cloud_platform: CloudPlatform, use_case: UseCase) -> str:
-    """Generate sample TypeScript code."""
+PYTHON_CODE_TEMPLATES: dict[CloudPlatform, Callable[[str], str]] = {
+    CloudPlatform.AWS_BEDROCK: _aws_python_code,
+    CloudPlatform.GCP_VERTEX: _gcp_python_code,
+}
+
+
+@lru_cache(maxsize=None)
+def _generate_python_code(cloud_platform: CloudPlatform, use_case: UseCase) -> str:
+    """Generate sample Python code."""
     use_case_label = use_case.value.replace("-", " ").title()
+    return PYTHON_CODE_TEMPLATES[cloud_platform](use_case_label)
+
 
-    if cloud_platform == CloudPlatform.AWS_BEDROCK:
-        return f'''/**
+def _aws_typescript_code(use_case_label: str) -> str:
+    """Sample TypeScript code for AWS Bedrock."""
+    return f'''/**
  * Sample TypeScript code for {use_case_label} using AWS Bedrock.
  */
 
@@ -635,8 +773,11 @@ export async function invokeClaude(prompt: string): Promise<string> {{
   return result.content[0].text;
 }}
 '''
-    else:
-        return f'''/**
+
+
+def _gcp_typescript_code(use_case_label: str) -> str:
+    """Sample TypeScript code for GCP Vertex AI."""
+    return f'''/**
  * Sample TypeScript code for {use_case_label} using GCP Vertex AI.
  */
 
@@ -663,3 +804,16 @@ export async function invokeClaude(prompt: string): Promise<string> {{
   return result.response.candidates[0].content.parts[0].text;
 }}
 '''
+
+
+TYPESCRIPT_CODE_TEMPLATES: dict[CloudPlatform, Callable[[str], str]] = {
+    CloudPlatform.AWS_BEDROCK: _aws_typescript_code,
+    CloudPlatform.GCP_VERTEX: _gcp_typescript_code,
+}
+
+
+@lru_cache(maxsize=None)
+def _generate_typescript_code(cloud_platform: CloudPlatform, use_case: UseCase) -> str:
+    """Generate sample TypeScript code."""
+    use_case_label = use_case.value.replace("-", " ").title()
+    return TYPESCRIPT_CODE_TEMPLATES[cloud_platform](use_case_label)
@@ -7,13 +7,19 @@ This module provides functions to:
 - Track response changes over time
 """
 
-import json
+import heapq
 import os
+import tempfile
+import time
 from collections import defaultdict
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from typing import TypedDict
 
+import orjson
+
 from app.models import (
     CloudPlatform,
     DataClassification,
@@ -51,7 +57,69 @@ class ResponseListItem(TypedDict):
 # Base directory for saved responses
 RESPONSES_DIR = Path(__file__).parent / "responses"
 
+# Marks a missing key where None could be a real (if invalid) value
+_MISSING = object()
+
+# Lower-cased prefixes of the Mermaid diagram types we accept
+MERMAID_DIAGRAM_TYPES = ("flowchart", "graph", "sequencediagram", "classdiagram", "statediagram")
+
+# Threads used to read metadata in list_saved_responses
+LIST_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Each response file has a small metadata sidecar so listing never parses bodies
+META_SUFFIX = ".meta.json"
+
+
+def _current_umask() -> int:
+    """Read the process umask (os.umask can only read it by setting it)."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Mode a plain open() would give saved files; temp files are created 0600
+FILE_MODE = 0o666 & ~_current_umask()
 
+
+def _meta_path(filepath: Path) -> Path:
+    """Return the metadata sidecar path for a saved response file."""
+    return filepath.with_suffix(META_SUFFIX)
+
+
+def _response_files(prefix: str = "") -> list[Path]:
+    """List saved response files whose names start with `prefix`, excluding sidecars."""
+    try:
+        with os.scandir(RESPONSES_DIR) as entries:
+            return [
+                RESPONSES_DIR / entry.name
+                for entry in entries
+                if entry.name.startswith(prefix)
+                and entry.name.endswith(".json")
+                and not entry.name.endswith(META_SUFFIX)
+            ]
+    except FileNotFoundError:
+        return []
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write `data` in one call to a temp file, then rename it over `path`.
+
+    Readers never see a half-written file; the temp name lacks a .json
+    suffix, so listings skip it, and it is removed if the write fails.
+    """
+    tmp = tempfile.NamedTemporaryFile("wb", dir=path.parent, delete=False)
+    try:
+        with tmp:
+            tmp.write(data)
+        os.chmod(tmp.name, FILE_MODE)
+        os.replace(tmp.name, path)
+    except BaseException:
+        # Don't leave a stray temp file behind in the responses directory
+        os.unlink(tmp.name)
+        raise
+
+
+@lru_cache(maxsize=None)
 def get_combination_id(
     use_case: UseCase,
     cloud_platform: CloudPlatform,
@@ -87,35 +155,38 @@ def save_response(
     Returns:
         Path to the saved response file
     """
-    # Ensure responses directory exists
+    # Ensure responses directory exists (it may be removed between saves)
     RESPONSES_DIR.mkdir(parents=True, exist_ok=True)
 
     combination_id = get_combination_id(
         use_case, cloud_platform, integration_pattern, data_classification, scale_tier
     )
 
-    # Create filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Create filename with a local-time timestamp (no datetime object needed)
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     filename = f"{combination_id}_{timestamp}.json"
     filepath = RESPONSES_DIR / filename
 
+    metadata: ResponseMetadata = {
+        "combination_id": combination_id,
+        "use_case": use_case.value,
+        "cloud_platform": cloud_platform.value,
+        "integration_pattern": integration_pattern.value,
+        "data_classification": data_classification.value,
+        "scale_tier": scale_tier.value,
+        "timestamp": timestamp,
+        "error": error,
+    }
+
     # Wrap response with metadata
     saved_data = {
-        "metadata": {
-            "combination_id": combination_id,
-            "use_case": use_case.value,
-            "cloud_platform": cloud_platform.value,
-            "integration_pattern": integration_pattern.value,
-            "data_classification": data_classification.value,
-            "scale_tier": scale_tier.value,
-            "timestamp": timestamp,
-            "error": error,
-        },
+        "metadata": metadata,
         "response": response_data,
     }
 
-    with open(filepath, "w") as f:
-        json.dump(saved_data, f, indent=2)
+    # Indented so saved responses stay readable when debugging
+    _write_atomic(filepath, orjson.dumps(saved_data, option=orjson.OPT_INDENT_2))
+    _write_atomic(_meta_path(filepath), orjson.dumps(metadata))
 
     return filepath
 
@@ -136,16 +207,33 @@ def load_latest_response(
         use_case, cloud_platform, integration_pattern, data_classification, scale_tier
     )
 
-    # Find all files matching this combination
-    pattern = f"{combination_id}_*.json"
-    matching_files = sorted(RESPONSES_DIR.glob(pattern), reverse=True)
+    # Find all files for this combination; names sort by timestamp
+    matching_files = _response_files(f"{combination_id}_")
 
     if not matching_files:
         return None
 
     # Load the most recent one
-    with open(matching_files[0]) as f:
-        return json.load(f)
+    return orjson.loads(max(matching_files).read_bytes())
+
+
+def _read_list_entry(filepath: Path) -> tuple[str, ResponseListItem] | None:
+    """Read one file's metadata as a (timestamp, item) pair, or None if unreadable."""
+    try:
+        # Read the small sidecar; files saved before sidecars, or with a damaged
+        # sidecar, fall back to the full body
+        try:
+            metadata = orjson.loads(_meta_path(filepath).read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            data: SavedResponse = orjson.loads(filepath.read_bytes())
+            metadata = data.get("metadata", {})
+        item = ResponseListItem(
+            filepath=str(filepath),
+            metadata=metadata,  # type: ignore[typeddict-item]
+        )
+        return metadata.get("timestamp", ""), item
+    except (orjson.JSONDecodeError, KeyError):
+        return None
 
 
 def list_saved_responses() -> list[ResponseListItem]:
@@ -154,33 +242,17 @@ def list_saved_responses() -> list[ResponseListItem]:
 
     Returns a list of metadata dictionaries sorted by timestamp (newest first).
     """
-    results: list[ResponseListItem] = []
-
     if not RESPONSES_DIR.exists():
-        return results
+        return []
 
-    for filepath in RESPONSES_DIR.glob("*.json"):
-        if filepath.name == ".gitkeep":
-            continue
-        try:
-            with open(filepath) as f:
-                data: SavedResponse = json.load(f)
-                results.append(
-                    ResponseListItem(
-                        filepath=str(filepath),
-                        metadata=data.get("metadata", {}),  # type: ignore[typeddict-item]
-                    )
-                )
-        except (json.JSONDecodeError, KeyError):
-            continue
+    # Reads release the GIL, so overlap them across a thread pool
+    with ThreadPoolExecutor(max_workers=LIST_WORKERS) as pool:
+        keyed = [entry for entry in pool.map(_read_list_entry, _response_files()) if entry]
 
     # Sort by timestamp (newest first)
-    results.sort(
-        key=lambda x: x.get("metadata", {}).get("timestamp", ""),
-        reverse=True,
-    )
+    keyed.sort(key=itemgetter(0), reverse=True)
 
-    return results
+    return [item for _, item in keyed]
 
 
 def get_failed_responses() -> list[ResponseListItem]:
@@ -206,26 +278,31 @@ def cleanup_old_responses(keep_latest: int = 5) -> int:
     if not RESPONSES_DIR.exists():
         return 0
 
-    # Group files by combination ID
-    files_by_combination: dict[str, list[Path]] = defaultdict(list)
+    # Group file names by combination ID in one directory pass
+    files_by_combination: dict[str, list[str]] = defaultdict(list)
 
-    for filepath in RESPONSES_DIR.glob("*.json"):
-        if filepath.name == ".gitkeep":
-            continue
-        # Extract combination ID from filename
-        parts = filepath.stem.rsplit("_", 2)
-        if len(parts) >= 2:
-            # Reconstruct combination ID (everything before last two parts which are timestamp)
-            combination_id = "_".join(parts[:-2]) if len(parts) > 2 else parts[0]
-            files_by_combination[combination_id].append(filepath)
+    with os.scandir(RESPONSES_DIR) as entries:
+        for entry in entries:
+            name = entry.name
+            if not name.endswith(".json") or name.endswith(META_SUFFIX):
+                continue
+            # Combination ID is everything before the _YYYYmmdd_HHMMSS timestamp
+            parts = name[:-len(".json")].rsplit("_", 2)
+            if len(parts) >= 2:
+                files_by_combination[parts[0]].append(name)
 
     deleted = 0
-    for combination_id, files in files_by_combination.items():
-        # Sort by name (which includes timestamp)
-        sorted_files = sorted(files, reverse=True)
-        # Delete files beyond keep_latest
-        for filepath in sorted_files[keep_latest:]:
+    for names in files_by_combination.values():
+        if len(names) <= keep_latest:
+            continue
+        # Names sort by timestamp within a combination
+        keep = set(heapq.nlargest(keep_latest, names))
+        for name in names:
+            if name in keep:
+                continue
+            filepath = RESPONSES_DIR / name
             filepath.unlink()
+            _meta_path(filepath).unlink(missing_ok=True)
             deleted += 1
 
     return deleted
@@ -241,44 +318,42 @@ def validate_response_structure(
     """
     errors: list[str] = []
 
-    # Check top-level sections
-    required_sections = ["architecture", "compliance", "deployment"]
-    for section in required_sections:
-        if section not in response_data:
+    # Check top-level sections, fetching each one once
+    sections = {}
+    for section in ("architecture", "compliance", "deployment"):
+        sections[section] = response_data.get(section, _MISSING)
+        if sections[section] is _MISSING:
             errors.append(f"Missing required section: {section}")
 
     # Validate architecture section
-    if "architecture" in response_data:
-        arch = response_data["architecture"]
-        if isinstance(arch, dict):
-            if "mermaidDiagram" not in arch:
-                errors.append("architecture.mermaidDiagram is missing")
-            if "components" not in arch or not isinstance(arch.get("components"), list):
-                errors.append("architecture.components is missing or not a list")
-            if "dataFlows" not in arch or not isinstance(arch.get("dataFlows"), list):
-                errors.append("architecture.dataFlows is missing or not a list")
+    arch = sections["architecture"]
+    if isinstance(arch, dict):
+        if "mermaidDiagram" not in arch:
+            errors.append("architecture.mermaidDiagram is missing")
+        if not isinstance(arch.get("components"), list):
+            errors.append("architecture.components is missing or not a list")
+        if not isinstance(arch.get("dataFlows"), list):
+            errors.append("architecture.dataFlows is missing or not a list")
 
     # Validate compliance section
-    if "compliance" in response_data:
-        comp = response_data["compliance"]
-        if isinstance(comp, dict):
-            if "checklist" not in comp or not isinstance(comp.get("checklist"), list):
-                errors.append("compliance.checklist is missing or not a list")
-            if "baaRequirements" not in comp:
-                errors.append("compliance.baaRequirements is missing")
+    comp = sections["compliance"]
+    if isinstance(comp, dict):
+        if not isinstance(comp.get("checklist"), list):
+            errors.append("compliance.checklist is missing or not a list")
+        if "baaRequirements" not in comp:
+            errors.append("compliance.baaRequirements is missing")
 
     # Validate deployment section
-    if "deployment" in response_data:
-        dep = response_data["deployment"]
-        if isinstance(dep, dict):
-            if "steps" not in dep or not isinstance(dep.get("steps"), list):
-                errors.append("deployment.steps is missing or not a list")
-            if "iamPolicies" not in dep or not isinstance(dep.get("iamPolicies"), list):
-                errors.append("deployment.iamPolicies is missing or not a list")
-            if "networkConfig" not in dep:
-                errors.append("deployment.networkConfig is missing")
-            if "monitoringSetup" not in dep:
-                errors.append("deployment.monitoringSetup is missing")
+    dep = sections["deployment"]
+    if isinstance(dep, dict):
+        if not isinstance(dep.get("steps"), list):
+            errors.append("deployment.steps is missing or not a list")
+        if not isinstance(dep.get("iamPolicies"), list):
+            errors.append("deployment.iamPolicies is missing or not a list")
+        if "networkConfig" not in dep:
+            errors.append("deployment.networkConfig is missing")
+        if "monitoringSetup" not in dep:
+            errors.append("deployment.monitoringSetup is missing")
 
     return errors
 
@@ -289,17 +364,22 @@ def validate_mermaid_syntax(diagram: str) -> list[str]:
 
     Returns a list of syntax errors (empty if valid).
     """
+    return list(_mermaid_errors(diagram))
+
+
+@lru_cache(maxsize=1024)
+def _mermaid_errors(diagram: str) -> tuple[str, ...]:
+    """Memoized body of validate_mermaid_syntax, keyed by the diagram text."""
     errors = []
 
     lines = diagram.strip().split("\n")
     if not lines:
         errors.append("Mermaid diagram is empty")
-        return errors
+        return tuple(errors)
 
     # Check diagram type
     first_line = lines[0].strip().lower()
-    valid_types = ["flowchart", "graph", "sequencediagram", "classDiagram", "statediagram"]
-    if not any(first_line.startswith(t.lower()) for t in valid_types):
+    if not first_line.startswith(MERMAID_DIAGRAM_TYPES):
         errors.append(f"Invalid diagram type: {first_line}")
 
     # Check for self-referential links
@@ -312,7 +392,7 @@ def validate_mermaid_syntax(diagram: str) -> list[str]:
                 if source and target and source == target:
                     errors.append(f"Self-referential link: {source} --> {source}")
 
-    return errors
+    return tuple(errors)
 
 
 def validate_iam_policies(policies: list[str], cloud_platform: CloudPlatform) -> list[str]:
@@ -322,15 +402,20 @@ def validate_iam_policies(policies: list[str], cloud_platform: CloudPlatform) ->
     Returns a list of validation errors (empty if valid).
     """
     errors = []
+    is_aws = cloud_platform == CloudPlatform.AWS_BEDROCK
 
     for i, policy_str in enumerate(policies):
+        # Policies are JSON objects; anything else fails without a parse
+        if not policy_str.lstrip().startswith("{"):
+            errors.append(f"Policy {i} is not a JSON object")
+            continue
         try:
-            policy = json.loads(policy_str)
-        except json.JSONDecodeError as e:
+            policy = orjson.loads(policy_str)
+        except orjson.JSONDecodeError as e:
             errors.append(f"Policy {i} is not valid JSON: {e}")
             continue
 
-        if cloud_platform == CloudPlatform.AWS_BEDROCK:
+        if is_aws:
             if "Version" not in policy:
                 errors.append(f"AWS policy {i} missing Version")
             if "Statement" not in policy:
@@ -0,0 +1,42 @@
+"""
+Tests for application settings.
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+
+
+class TestSettings:
+    """Tests for the Settings class."""
+
+    def test_defaults(self, monkeypatch):
+        """Should fall back to defaults when variables are unset."""
+        for name in ("ANTHROPIC_API_KEY", "ANTHROPIC_MODEL", "CORS_ORIGINS"):
+            monkeypatch.delenv(name, raising=False)
+
+        settings = Settings(_env_file=None)
+
+        assert settings.anthropic_api_key == ""
+        assert settings.anthropic_model == "claude-sonnet-4-20250514"
+        assert settings.cors_origins == "http://localhost:5173"
+
+    def test_reads_environment(self, monkeypatch):
+        """Should read upper-case environment variables."""
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-ant-api03-test-key")
+        monkeypatch.setenv("ANTHROPIC_MODEL", "claude-test-model")
+        monkeypatch.setenv("CORS_ORIGINS", "https://a.example")
+
+        settings = Settings(_env_file=None)
+
+        assert settings.anthropic_api_key == "sk-ant-api03-test-key"
+        assert settings.anthropic_model == "claude-test-model"
+        assert settings.cors_origins == "https://a.example"
+
+    def test_is_frozen(self):
+        """Settings should be immutable once parsed."""
+        settings = Settings(_env_file=None)
+
+        with pytest.raises(ValidationError):
+            settings.anthropic_model = "other"
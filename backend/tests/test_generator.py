@@ -2,11 +2,23 @@
 Tests for the Architecture Generator service.
 """
 
+import asyncio
+import gc
 import json
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
-from unittest.mock import MagicMock, patch
 
 from app.models import ArchitectureRequest, UseCase, CloudPlatform, IntegrationPattern, DataClassification, ScaleTier
+from app.services.generator import (
+    HTTP_LIMITS,
+    HTTP_TIMEOUT,
+    MAX_RESPONSE_SIZE,
+    ArchitectureGenerator,
+    SectionScanner,
+    strip_markdown_fences,
+)
+from tests.conftest import MockStreamContext, MockTextBlock
 
 
 class TestArchitectureGenerator:
@@ -25,16 +37,36 @@ class TestArchitectureGenerator:
 
     def test_generator_initialization(self, mock_anthropic_client):
         """Generator should initialize with API key."""
-        from app.services.generator import ArchitectureGenerator
-
         generator = ArchitectureGenerator("sk-ant-api03-test-key")
         assert generator.client is not None
         assert generator.model == "claude-sonnet-4-20250514"
 
+    def test_generator_keeps_connections_alive(self, mock_anthropic_client, monkeypatch):
+        """Client should reuse pooled connections across requests."""
+        import anthropic
+
+        http_client_factory = MagicMock()
+        monkeypatch.setattr(anthropic, "DefaultAsyncHttpxClient", http_client_factory)
+
+        ArchitectureGenerator("sk-ant-api03-test-key")
+
+        http_client_factory.assert_called_once_with(limits=HTTP_LIMITS)
+        kwargs = anthropic.AsyncAnthropic.call_args.kwargs
+        assert kwargs["http_client"] is http_client_factory.return_value
+        assert kwargs["timeout"] is HTTP_TIMEOUT
+        assert HTTP_LIMITS.keepalive_expiry > 5.0
+
+    def test_generator_fails_fast_on_connect(self, mock_anthropic_client):
+        """Connection attempts should time out well before the read timeout."""
+        import anthropic
+
+        ArchitectureGenerator("sk-ant-api03-test-key")
+        timeout = anthropic.AsyncAnthropic.call_args.kwargs["timeout"]
+        assert timeout.connect == 5.0
+        assert timeout.read == 120.0
+
     def test_generator_loads_prompts(self, mock_anthropic_client):
         """Generator should load prompt files."""
-        from app.services.generator import ArchitectureGenerator
-
         generator = ArchitectureGenerator("sk-ant-api03-test-key")
         # System prompt should be loaded (may be empty in test env)
         assert hasattr(generator, 'system_prompt')
@@ -42,92 +74,90 @@ class TestArchitectureGenerator:
 
     @pytest.mark.asyncio
     async def test_generate_validates_response_structure(
-        self, mock_anthropic_client, sample_request, sample_architecture_response
+        self, mock_anthropic_client, generator, sample_request, sample_architecture_json
     ):
         """Generator should validate response has required keys."""
-        from app.services.generator import ArchitectureGenerator
-
         # Mock the Claude response
-        mock_message = MagicMock()
-        mock_message.stop_reason = "end_turn"
-        mock_message.content = [MagicMock(text=json.dumps(sample_architecture_response))]
-        mock_anthropic_client.messages.create.return_value = mock_message
-
-        generator = ArchitectureGenerator("sk-ant-api03-test-key")
+        mock_anthropic_client.messages.stream.return_value = MockStreamContext(
+            sample_architecture_json
+        )
         response = await generator.generate(sample_request)
 
         assert response is not None
         assert response.architecture is not None
 
+    @pytest.mark.asyncio
+    async def test_generate_sends_static_prompt_as_cached_prefix(
+        self, mock_anthropic_client, generator, sample_request, sample_architecture_json
+    ):
+        """Static prompt content should lead the user message with cache_control."""
+        mock_anthropic_client.messages.stream.return_value = MockStreamContext(
+            sample_architecture_json
+        )
+        other_request = sample_request.model_copy(
+            update={"use_case": UseCase.MEDICAL_CODING, "cloud_platform": CloudPlatform.GCP_VERTEX}
+        )
+        await generator.generate(sample_request)
+        await generator.generate(other_request)
+
+        first_call, second_call = mock_anthropic_client.messages.stream.call_args_list
+        first_static, first_cloud, first_dynamic = first_call.kwargs["messages"][0]["content"]
+        second_static, second_cloud, second_dynamic = second_call.kwargs["messages"][0]["content"]
+
+        # Cached prefix must be byte-identical across configurations
+        assert first_static["cache_control"] == {"type": "ephemeral"}
+        assert first_static["text"] == second_static["text"] == generator.static_prompt
+        # Cloud context is cached per platform
+        assert first_cloud["cache_control"] == {"type": "ephemeral"}
+        assert first_cloud["text"] == generator.cloud_prompts[CloudPlatform.AWS_BEDROCK]
+        assert second_cloud["text"] == generator.cloud_prompts[CloudPlatform.GCP_VERTEX]
+        assert "cache_control" not in first_dynamic
+        assert first_dynamic["text"] != second_dynamic["text"]
+        assert "Cloud Platform Context" not in first_dynamic["text"]
+
     @pytest.mark.asyncio
     async def test_generate_rejects_truncated_response(
-        self, mock_anthropic_client, sample_request
+        self, mock_anthropic_client, generator, sample_request
     ):
         """Generator should reject truncated responses."""
-        from app.services.generator import ArchitectureGenerator
-
         # Mock truncated response
-        mock_message = MagicMock()
-        mock_message.stop_reason = "max_tokens"  # Indicates truncation
-        mock_message.content = [MagicMock(text='{"partial": "data"}')]
-        mock_anthropic_client.messages.create.return_value = mock_message
-
-        generator = ArchitectureGenerator("sk-ant-api03-test-key")
+        mock_anthropic_client.messages.stream.return_value = MockStreamContext(
+            '{"partial": "data"}', stop_reason="max_tokens"  # Indicates truncation
+        )
 
         with pytest.raises(ValueError, match="exceeded maximum length"):
             await generator.generate(sample_request)
 
     @pytest.mark.asyncio
     async def test_generate_rejects_invalid_json(
-        self, mock_anthropic_client, sample_request
+        self, mock_anthropic_client, generator, sample_request
     ):
         """Generator should reject invalid JSON responses."""
-        from app.services.generator import ArchitectureGenerator
-
         # Mock invalid JSON response
-        mock_message = MagicMock()
-        mock_message.stop_reason = "end_turn"
-        mock_message.content = [MagicMock(text='not valid json {')]
-        mock_anthropic_client.messages.create.return_value = mock_message
-
-        generator = ArchitectureGenerator("sk-ant-api03-test-key")
+        mock_anthropic_client.messages.stream.return_value = MockStreamContext('not valid json {')
 
         with pytest.raises(ValueError, match="Invalid response format"):
             await generator.generate(sample_request)
 
     @pytest.mark.asyncio
     async def test_generate_rejects_missing_keys(
-        self, mock_anthropic_client, sample_request
+        self, mock_anthropic_client, generator, sample_request
     ):
         """Generator should reject responses missing required keys."""
-        from app.services.generator import ArchitectureGenerator
-
         # Mock response missing required keys
-        mock_message = MagicMock()
-        mock_message.stop_reason = "end_turn"
-        mock_message.content = [MagicMock(text='{"architecture": {}}')]  # Missing other keys
-        mock_anthropic_client.messages.create.return_value = mock_message
-
-        generator = ArchitectureGenerator("sk-ant-api03-test-key")
+        mock_anthropic_client.messages.stream.return_value = MockStreamContext('{"architecture": {}}')  # Missing other keys
 
         with pytest.raises(ValueError, match="Incomplete response"):
             await generator.generate(sample_request)
 
     @pytest.mark.asyncio
     async def test_generate_handles_markdown_wrapped_json(
-        self, mock_anthropic_client, sample_request, sample_architecture_response
+        self, mock_anthropic_client, generator, sample_request, sample_architecture_json
     ):
         """Generator should handle JSON wrapped in markdown code blocks."""
-        from app.services.generator import ArchitectureGenerator
-
         # Mock response with markdown
-        wrapped_json = f"```json\n{json.dumps(sample_architecture_response)}\n```"
-        mock_message = MagicMock()
-        mock_message.stop_reason = "end_turn"
-        mock_message.content = [MagicMock(text=wrapped_json)]
-        mock_anthropic_client.messages.create.return_value = mock_message
-
-        generator = ArchitectureGenerator("sk-ant-api03-test-key")
+        wrapped_json = f"```json\n{sample_architecture_json}\n```"
+        mock_anthropic_client.messages.stream.return_value = MockStreamContext(wrapped_json)
         response = await generator.generate(sample_request)
 
         assert response is not None
@@ -137,18 +167,36 @@ class TestResponseSizeLimit:
     """Tests for response size validation."""
 
     @pytest.mark.asyncio
-    async def test_rejects_oversized_response(self, mock_anthropic_client):
+    async def test_rejects_oversized_response(self, mock_anthropic_client, generator):
         """Should reject responses exceeding size limit."""
-        from app.services.generator import ArchitectureGenerator, MAX_RESPONSE_SIZE
-
         # Create oversized response
         large_text = "x" * (MAX_RESPONSE_SIZE + 1000)
-        mock_message = MagicMock()
-        mock_message.stop_reason = "end_turn"
-        mock_message.content = [MagicMock(text=large_text)]
-        mock_anthropic_client.messages.create.return_value = mock_message
+        mock_anthropic_client.messages.stream.return_value = MockStreamContext(large_text)
+        request = ArchitectureRequest(
+            use_case=UseCase.CLINICAL_DOCUMENTATION,
+            cloud_platform=CloudPlatform.AWS_BEDROCK,
+            integration_pattern=IntegrationPattern.API_GATEWAY,
+            data_classification=DataClassification.PHI,
+            scale_tier=ScaleTier.PRODUCTION
+        )
 
-        generator = ArchitectureGenerator("sk-ant-api03-test-key")
+        with pytest.raises(ValueError, match="too large"):
+            await generator.generate(request)
+
+    @pytest.mark.asyncio
+    async def test_oversized_response_aborts_stream_early(self, mock_anthropic_client, generator):
+        """Should stop reading the stream as soon as the limit is crossed."""
+        class CountingStreamContext(MockStreamContext):
+            chunks_read = 0
+
+            @property
+            async def text_stream(self):
+                async for chunk in super().text_stream:
+                    self.chunks_read += 1
+                    yield chunk
+
+        stream = CountingStreamContext("x" * (MAX_RESPONSE_SIZE * 4), chunk_size=10_000)
+        mock_anthropic_client.messages.stream.return_value = stream
         request = ArchitectureRequest(
             use_case=UseCase.CLINICAL_DOCUMENTATION,
             cloud_platform=CloudPlatform.AWS_BEDROCK,
@@ -159,3 +207,326 @@ class TestResponseSizeLimit:
 
         with pytest.raises(ValueError, match="too large"):
             await generator.generate(request)
+        assert stream.chunks_read == MAX_RESPONSE_SIZE // 10_000 + 1
+
+
+class TestResponseCache:
+    """Tests for the per-configuration response cache."""
+
+    @pytest.fixture
+    def sample_request(self):
+        """Create a sample architecture request."""
+        return ArchitectureRequest(
+            use_case=UseCase.CLINICAL_DOCUMENTATION,
+            cloud_platform=CloudPlatform.AWS_BEDROCK,
+            integration_pattern=IntegrationPattern.API_GATEWAY,
+            data_classification=DataClassification.PHI,
+            scale_tier=ScaleTier.PRODUCTION
+        )
+
+    @pytest.mark.asyncio
+    async def test_repeated_request_served_from_cache(
+        self, mock_anthropic_client, generator, sample_request, sample_architecture_json
+    ):
+        """Identical configurations should only call Claude once."""
+        mock_anthropic_client.messages.stream.return_value = MockStreamContext(
+            sample_architecture_json
+        )
+        first = await generator.generate(sample_request)
+        second = await generator.generate(sample_request.model_copy())
+
+        assert second is first
+        assert mock_anthropic_client.messages.stream.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_different_configurations_not_shared(
+        self, mock_anthropic_client, generator, sample_request, sample_architecture_json
+    ):
+        """Each configuration should be generated independently."""
+        mock_anthropic_client.messages.stream.return_value = MockStreamContext(
+            sample_architecture_json
+        )
+        await generator.generate(sample_request)
+        await generator.generate(sample_request.model_copy(update={"scale_tier": ScaleTier.PILOT}))
+
+        assert mock_anthropic_client.messages.stream.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_call(
+        self, mock_anthropic_client, generator, sample_request, sample_architecture_json
+    ):
+        """Identical requests arriving together should wait on a single Claude call."""
+        mock_anthropic_client.messages.stream.return_value = MockStreamContext(
+            sample_architecture_json
+        )
+        first, second = await asyncio.gather(
+            generator.generate(sample_request),
+            generator.generate(sample_request.model_copy()),
+        )
+
+        assert second is first
+        assert mock_anthropic_client.messages.stream.call_count == 1
+        assert generator._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_failure_propagates_to_all_callers(
+        self, mock_anthropic_client, generator, sample_request
+    ):
+        """A failed shared call should raise for every waiting request."""
+        mock_anthropic_client.messages.stream.return_value = MockStreamContext('not valid json {')
+        results = await asyncio.gather(
+            generator.generate(sample_request),
+            generator.generate(sample_request),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert mock_anthropic_client.messages.stream.call_count == 1
+        assert generator._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_failure_after_callers_cancelled_is_retrieved(self, generator, sample_request, monkeypatch):
+        """A shared call failing after every caller left should not log an unretrieved exception."""
+        release = asyncio.Event()
+
+        async def fail_later(request, cache_key):
+            await release.wait()
+            raise ValueError("Invalid response format from AI model")
+
+        monkeypatch.setattr(generator, "_generate_uncached", fail_later)
+        loop = asyncio.get_running_loop()
+        reported = []
+        previous_handler = loop.get_exception_handler()
+        loop.set_exception_handler(lambda loop, context: reported.append(context))
+        try:
+            caller = asyncio.ensure_future(generator.generate(sample_request))
+            # Let the caller start the shared call and the call block on `release`
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            task = next(iter(generator._inflight.values()))
+            caller.cancel()
+            await asyncio.wait([caller])
+            release.set()
+            await asyncio.wait([task])
+
+            del caller, task
+            gc.collect()
+        finally:
+            loop.set_exception_handler(previous_handler)
+
+        assert reported == []
+        assert generator._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_failed_generation_not_cached(
+        self, mock_anthropic_client, generator, sample_request, sample_architecture_json
+    ):
+        """Invalid responses should not populate the cache."""
+        mock_anthropic_client.messages.stream.return_value = MockStreamContext('not valid json {')
+
+        with pytest.raises(ValueError):
+            await generator.generate(sample_request)
+
+        mock_anthropic_client.messages.stream.return_value = MockStreamContext(
+            sample_architecture_json
+        )
+        response = await generator.generate(sample_request)
+        assert response.architecture is not None
+
+
+class TestGenerateMany:
+    """Tests for concurrent multi-configuration generation."""
+
+    @pytest.mark.asyncio
+    async def test_bounds_concurrency_and_keeps_order(self, mock_anthropic_client, generator, sample_architecture_json):
+        """No more than `concurrency` calls should run at once."""
+        active = 0
+        peak = 0
+
+        class TrackingStreamContext(MockStreamContext):
+            async def __aenter__(self):
+                nonlocal active, peak
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                return self
+
+            async def __aexit__(self, *args):
+                nonlocal active
+                active -= 1
+
+        responses = iter([
+            TrackingStreamContext("not json"),
+            *(TrackingStreamContext(sample_architecture_json) for _ in range(3)),
+        ])
+        mock_anthropic_client.messages.stream.side_effect = lambda **kwargs: next(responses)
+        requests = [
+            ArchitectureRequest(
+                use_case=use_case,
+                cloud_platform=CloudPlatform.AWS_BEDROCK,
+                integration_pattern=IntegrationPattern.API_GATEWAY,
+                data_classification=DataClassification.PHI,
+                scale_tier=ScaleTier.PRODUCTION
+            )
+            for use_case in UseCase
+        ]
+
+        results = await generator.generate_many(requests, concurrency=2)
+
+        assert peak == 2
+        assert isinstance(results[0], ValueError)
+        assert all(result.architecture is not None for result in results[1:])
+
+
+class TestGenerateBatch:
+    """Tests for Message Batches generation."""
+
+    @staticmethod
+    def _entry(custom_id, text=None, result_type="succeeded", stop_reason="end_turn"):
+        entry = MagicMock(custom_id=custom_id)
+        entry.result.type = result_type
+        entry.result.message.stop_reason = stop_reason
+        entry.result.message.content = [MockTextBlock(text)]
+        return entry
+
+    @staticmethod
+    def _requests():
+        return [
+            ArchitectureRequest(
+                use_case=UseCase.CLINICAL_DOCUMENTATION,
+                cloud_platform=platform,
+                integration_pattern=IntegrationPattern.API_GATEWAY,
+                data_classification=DataClassification.PHI,
+                scale_tier=ScaleTier.PRODUCTION
+            )
+            for platform in (CloudPlatform.AWS_BEDROCK, CloudPlatform.GCP_VERTEX)
+        ]
+
+    def _mock_batches(self, client, entries):
+        async def results(batch_id):
+            async def iterate():
+                for entry in entries:
+                    yield entry
+            return iterate()
+
+        batches = client.messages.batches
+        batches.create = AsyncMock(return_value=MagicMock(id="batch_1", processing_status="in_progress"))
+        batches.retrieve = AsyncMock(return_value=MagicMock(id="batch_1", processing_status="ended"))
+        batches.results = AsyncMock(side_effect=results)
+        return batches
+
+    @pytest.mark.asyncio
+    async def test_returns_results_in_request_order(self, mock_anthropic_client, generator, sample_architecture_json):
+        """Results may arrive out of order and should be matched by custom_id."""
+        text = sample_architecture_json
+        batches = self._mock_batches(mock_anthropic_client, [self._entry("1", text), self._entry("0", text)])
+        requests = self._requests()
+
+        responses = await generator.generate_batch(requests, poll_interval=0)
+
+        assert all(response is not None for response in responses)
+        submitted = batches.create.call_args.kwargs["requests"]
+        assert [r["custom_id"] for r in submitted] == ["0", "1"]
+        assert submitted[0]["params"]["max_tokens"] == 32768
+        batches.retrieve.assert_awaited_once_with("batch_1")
+
+        # Batch results should serve later interactive requests
+        await generator.generate(requests[0])
+        mock_anthropic_client.messages.stream.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_entries_are_none(self, mock_anthropic_client, generator, sample_architecture_json):
+        """Errored, truncated or invalid results should not fail the whole batch."""
+        self._mock_batches(mock_anthropic_client, [
+            self._entry("0", "not json"),
+            self._entry("1", sample_architecture_json, stop_reason="max_tokens"),
+            self._entry("2", result_type="errored"),
+        ])
+
+        responses = await generator.generate_batch(self._requests() + self._requests()[:1], poll_interval=0)
+
+        assert responses == [None, None, None]
+
+
+class TestSectionScanner:
+    """Tests for incremental section extraction from streamed JSON."""
+
+    def test_ignores_braces_and_quotes_inside_strings(self):
+        """Braces and escaped quotes in string values should not end the section."""
+        text = '{"architecture": {"a": "x } { \\" }", "b": {"c": 1}}, "compliance": {}}'
+        scanner = SectionScanner("architecture")
+
+        assert scanner.feed(text) == {"a": 'x } { " }', "b": {"c": 1}}
+        assert scanner.done
+
+    def test_resumes_across_chunks(self):
+        """Should find keys and escapes split between chunks."""
+        text = '{"arch' + 'itecture": {"a": "\\' + '"}"}, "b": 2}'
+        scanner = SectionScanner("architecture")
+        parts = ['{"arch', 'itecture": {"a": "\\', '"}"}, "b": 2}']
+
+        accumulated = ""
+        results = []
+        for part in parts:
+            accumulated += part
+            results.append(scanner.feed(accumulated))
+
+        assert accumulated == text
+        assert results == [None, None, {"a": '"}'}]
+
+    def test_invalid_section_is_skipped(self):
+        """A section that is not valid JSON should be dropped, not retried."""
+        scanner = SectionScanner("architecture")
+
+        assert scanner.feed('{"architecture": {oops}}') is None
+        assert scanner.done
+
+    @pytest.mark.asyncio
+    async def test_stream_emits_each_section_once(
+        self, mock_anthropic_client, generator, sample_architecture_response, sample_architecture_json
+    ):
+        """generate_stream should emit every section as soon as it closes."""
+        mock_anthropic_client.messages.stream.return_value = MockStreamContext(
+            sample_architecture_json, chunk_size=7
+        )
+        request = ArchitectureRequest(
+            use_case=UseCase.CLINICAL_DOCUMENTATION,
+            cloud_platform=CloudPlatform.AWS_BEDROCK,
+            integration_pattern=IntegrationPattern.API_GATEWAY,
+            data_classification=DataClassification.PHI,
+            scale_tier=ScaleTier.PRODUCTION
+        )
+
+        events = [event async for event in generator.generate_stream(request)]
+        sections = [
+            json.loads(event.split(b"\r\ndata: ", 1)[1])
+            for event in events
+            if event.startswith(b"event: section\r\n")
+        ]
+
+        assert events[0] == b'event: started\r\ndata: {"status":"generating"}\r\n\r\n'
+        assert events[-1] == b'event: done\r\ndata: {"status":"complete"}\r\n\r\n'
+
+        assert [s["section"] for s in sections] == ["architecture", "compliance", "deployment"]
+        for section in sections:
+            assert section["data"] == sample_architecture_response[section["section"]]
+
+
+class TestStripMarkdownFences:
+    """Tests for markdown fence cleanup of Claude responses."""
+
+    @pytest.mark.parametrize(
+        "raw, expected",
+        [
+            ('{"a": 1}', '{"a": 1}'),
+            ('  {"a": 1}\n', '{"a": 1}'),
+            ('```json\n{"a": 1}\n```', '{"a": 1}'),
+            ('```\n{"a": 1}\n```\n', '{"a": 1}'),
+            ('```json\n{"a": 1}', '{"a": 1}'),
+            ('{"a": "```"}', '{"a": "```"}'),
+            ("", ""),
+        ],
+    )
+    def test_strips_fences_and_whitespace(self, raw, expected):
+        """Should return only the payload between optional fences."""
+        assert strip_markdown_fences(raw) == expected
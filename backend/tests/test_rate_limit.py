@@ -0,0 +1,77 @@
+"""
+Tests for the per-IP token bucket rate limiter.
+"""
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app import rate_limit
+from app.rate_limit import TokenBucketLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable replacement for time.monotonic."""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestTokenBucketLimiter:
+    """Tests for the TokenBucketLimiter class."""
+
+    def test_allows_burst_up_to_capacity(self, clock):
+        """Should allow `capacity` requests, then reject."""
+        limiter = TokenBucketLimiter(capacity=10, period=60.0)
+
+        assert all(limiter.hit("1.2.3.4") for _ in range(10))
+        assert not limiter.hit("1.2.3.4")
+
+    def test_refills_over_time(self, clock):
+        """Should grant one token per period / capacity seconds."""
+        limiter = TokenBucketLimiter(capacity=10, period=60.0)
+        for _ in range(10):
+            limiter.hit("1.2.3.4")
+
+        clock[0] += 5.9
+        assert not limiter.hit("1.2.3.4")
+        clock[0] += 0.2
+        assert limiter.hit("1.2.3.4")
+        assert not limiter.hit("1.2.3.4")
+
+    def test_clients_limited_independently(self, clock):
+        """One client's usage should not affect another."""
+        limiter = TokenBucketLimiter(capacity=1, period=60.0)
+
+        assert limiter.hit("1.2.3.4")
+        assert not limiter.hit("1.2.3.4")
+        assert limiter.hit("5.6.7.8")
+
+    def test_evicts_least_recently_seen_client(self, clock):
+        """Tracked clients should be capped at max_clients."""
+        limiter = TokenBucketLimiter(capacity=1, period=60.0, max_clients=2)
+
+        limiter.hit("a")
+        limiter.hit("b")
+        limiter.hit("a")
+        limiter.hit("c")
+
+        assert list(limiter._buckets) == ["a", "c"]
+
+    def test_dependency_returns_429_when_exhausted(self, clock):
+        """Should reject requests over the limit with 429."""
+        limiter = TokenBucketLimiter(capacity=2, period=60.0)
+        app = FastAPI()
+
+        @app.get("/limited", dependencies=[Depends(limiter)])
+        async def limited():
+            return {"ok": True}
+
+        client = TestClient(app)
+        assert client.get("/limited").status_code == 200
+        assert client.get("/limited").status_code == 200
+
+        response = client.get("/limited")
+        assert response.status_code == 429
+        assert "Rate limit exceeded" in response.json()["detail"]
@@ -0,0 +1,196 @@
+"""
+Tests for saving, listing and cleaning up debug responses.
+"""
+
+from itertools import count
+
+import orjson
+import pytest
+
+from app.models import (
+    CloudPlatform,
+    DataClassification,
+    IntegrationPattern,
+    ScaleTier,
+    UseCase,
+)
+from tests.fixtures import response_storage
+from tests.fixtures.response_storage import (
+    META_SUFFIX,
+    cleanup_old_responses,
+    get_failed_responses,
+    list_saved_responses,
+    load_latest_response,
+    save_response,
+)
+
+AWS_COMBINATION = (
+    UseCase.CLINICAL_DOCUMENTATION,
+    CloudPlatform.AWS_BEDROCK,
+    IntegrationPattern.API_GATEWAY,
+    DataClassification.PHI,
+    ScaleTier.PRODUCTION,
+)
+GCP_COMBINATION = (
+    UseCase.PRIOR_AUTHORIZATION,
+    CloudPlatform.GCP_VERTEX,
+    IntegrationPattern.EVENT_DRIVEN,
+    DataClassification.PHI,
+    ScaleTier.PILOT,
+)
+
+
+@pytest.fixture
+def responses_dir(tmp_path, monkeypatch):
+    """Point RESPONSES_DIR at an empty, not yet created directory."""
+    path = tmp_path / "responses"
+    monkeypatch.setattr(response_storage, "RESPONSES_DIR", path)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    """Give each save a distinct, increasing timestamp."""
+    ticks = count()
+    monkeypatch.setattr(
+        response_storage.time, "strftime", lambda fmt: f"20260101_{next(ticks):06d}"
+    )
+
+
+class TestSaveAndLoad:
+    """Tests for save_response and load_latest_response."""
+
+    def test_save_writes_body_and_sidecar(self, responses_dir):
+        """Should write the wrapped response and a metadata-only sidecar."""
+        path = save_response({"answer": "42"}, *AWS_COMBINATION)
+
+        assert path.parent == responses_dir
+        sidecar = path.with_suffix(META_SUFFIX)
+        assert sidecar.exists()
+
+        saved = load_latest_response(*AWS_COMBINATION)
+        assert saved["response"] == {"answer": "42"}
+        assert saved["metadata"]["cloud_platform"] == "aws-bedrock"
+        assert saved["metadata"]["error"] is None
+        assert sidecar.read_bytes() == orjson.dumps(saved["metadata"])
+
+    def test_save_recreates_removed_directory(self, responses_dir):
+        """Should save even if the directory was removed after an earlier save."""
+        first = save_response({}, *AWS_COMBINATION)
+        for path in responses_dir.iterdir():
+            path.unlink()
+        responses_dir.rmdir()
+
+        second = save_response({}, *AWS_COMBINATION)
+
+        assert not first.exists()
+        assert second.exists()
+
+    def test_failed_write_leaves_no_temp_file(self, responses_dir, monkeypatch):
+        """A failed rename should remove the temp file and re-raise."""
+        responses_dir.mkdir()
+
+        def fail(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(response_storage.os, "replace", fail)
+
+        with pytest.raises(OSError, match="disk full"):
+            save_response({}, *AWS_COMBINATION)
+        assert list(responses_dir.iterdir()) == []
+
+    def test_load_latest_returns_newest(self, responses_dir):
+        """Should return the most recently saved response for the combination."""
+        save_response({"n": "1"}, *AWS_COMBINATION)
+        save_response({"n": "2"}, *AWS_COMBINATION)
+        save_response({"n": "other"}, *GCP_COMBINATION)
+
+        assert load_latest_response(*AWS_COMBINATION)["response"] == {"n": "2"}
+
+    def test_load_latest_without_saves(self, responses_dir):
+        """Should return None when nothing was saved, even without the directory."""
+        assert load_latest_response(*AWS_COMBINATION) is None
+
+
+class TestListSavedResponses:
+    """Tests for list_saved_responses and get_failed_responses."""
+
+    def test_lists_newest_first(self, responses_dir):
+        """Should list every response once, newest first, skipping sidecars."""
+        paths = [
+            save_response({}, *AWS_COMBINATION),
+            save_response({}, *GCP_COMBINATION),
+            save_response({}, *AWS_COMBINATION),
+        ]
+
+        listed = [item["filepath"] for item in list_saved_responses()]
+
+        assert listed == [str(path) for path in reversed(paths)]
+
+    def test_missing_sidecar_falls_back_to_body(self, responses_dir):
+        """Files saved before sidecars existed should still be listed."""
+        path = save_response({}, *AWS_COMBINATION, error="bad diagram")
+        path.with_suffix(META_SUFFIX).unlink()
+
+        [item] = list_saved_responses()
+
+        assert item["filepath"] == str(path)
+        assert item["metadata"]["error"] == "bad diagram"
+
+    def test_corrupt_sidecar_falls_back_to_body(self, responses_dir):
+        """A damaged sidecar should not hide its response."""
+        path = save_response({}, *AWS_COMBINATION, error="bad diagram")
+        path.with_suffix(META_SUFFIX).write_bytes(b"{not json")
+
+        [item] = list_saved_responses()
+
+        assert item["metadata"]["error"] == "bad diagram"
+
+    def test_skips_unreadable_body_without_sidecar(self, responses_dir):
+        """A corrupt body with no sidecar should be skipped, not raise."""
+        path = save_response({}, *AWS_COMBINATION)
+        path.with_suffix(META_SUFFIX).unlink()
+        path.write_bytes(b"{not json")
+        kept = save_response({}, *GCP_COMBINATION)
+
+        assert [item["filepath"] for item in list_saved_responses()] == [str(kept)]
+
+    def test_empty_without_directory(self, responses_dir):
+        """Should return an empty list when nothing was ever saved."""
+        assert list_saved_responses() == []
+
+    def test_failed_responses_only_include_errors(self, responses_dir):
+        """Should return only responses saved with an error."""
+        save_response({}, *AWS_COMBINATION)
+        failed = save_response({}, *GCP_COMBINATION, error="IAM errors")
+
+        assert [item["filepath"] for item in get_failed_responses()] == [str(failed)]
+
+
+class TestCleanupOldResponses:
+    """Tests for cleanup_old_responses."""
+
+    def test_keeps_latest_per_combination(self, responses_dir):
+        """Should keep the newest `keep_latest` files of each combination with sidecars."""
+        aws = [save_response({}, *AWS_COMBINATION) for _ in range(4)]
+        gcp = [save_response({}, *GCP_COMBINATION) for _ in range(2)]
+
+        deleted = cleanup_old_responses(keep_latest=2)
+
+        assert deleted == 2
+        remaining = sorted(responses_dir.iterdir())
+        expected = aws[2:] + gcp
+        assert remaining == sorted(
+            expected + [p.with_suffix(META_SUFFIX) for p in expected]
+        )
+
+    def test_nothing_to_delete(self, responses_dir):
+        """Should delete nothing when every combination is within the limit."""
+        save_response({}, *AWS_COMBINATION)
+
+        assert cleanup_old_responses(keep_latest=5) == 0
+        assert len(list(responses_dir.iterdir())) == 2
+
+    def test_missing_directory(self, responses_dir):
+        """Should return 0 when the directory does not exist."""
+        assert cleanup_old_responses() == 0
@@ -1,37 +1,34 @@
 """
 Pytest configuration and fixtures for scenario combination tests.
+
+Mock response factories and MockStreamContext live in tests/conftest.py.
 """
 
-import json
-from itertools import product
-from unittest.mock import MagicMock
+from itertools import combinations, product
 
 import pytest
 
 from app.models import (
     ArchitectureRequest,
+    ArchitectureResponse,
     CloudPlatform,
     DataClassification,
     IntegrationPattern,
     ScaleTier,
     UseCase,
 )
-from tests.fixtures.mock_responses import (
-    generate_mock_architecture_response,
-    generate_mock_code_response,
-    generate_mock_streaming_response,
-)
+from tests.fixtures.mock_responses import generate_mock_architecture_response
 
 
 # All parameter values
-USE_CASES = list(UseCase)
-CLOUD_PLATFORMS = list(CloudPlatform)
-INTEGRATION_PATTERNS = list(IntegrationPattern)
-DATA_CLASSIFICATIONS = list(DataClassification)
-SCALE_TIERS = list(ScaleTier)
+USE_CASES = tuple(UseCase)
+CLOUD_PLATFORMS = tuple(CloudPlatform)
+INTEGRATION_PATTERNS = tuple(IntegrationPattern)
+DATA_CLASSIFICATIONS = tuple(DataClassification)
+SCALE_TIERS = tuple(ScaleTier)
 
 # Generate all 288 combinations
-ALL_COMBINATIONS = list(
+ALL_COMBINATIONS: tuple[tuple, ...] = tuple(
     product(
         USE_CASES,
         CLOUD_PLATFORMS,
@@ -41,9 +38,43 @@ ALL_COMBINATIONS = list(
     )
 )
 
+
+def pairwise_combinations(*value_lists: tuple) -> tuple[tuple, ...]:
+    """
+    Pick a subset of the full product that still covers every pair of values.
+
+    Greedy: repeatedly take the first combination covering the most pairs not
+    yet seen. Deterministic, so test IDs are stable between runs.
+    """
+
+    def pairs(combo: tuple) -> set:
+        return {
+            (i, combo[i], j, combo[j]) for i, j in combinations(range(len(combo)), 2)
+        }
+
+    candidates = [(combo, pairs(combo)) for combo in product(*value_lists)]
+    uncovered = set().union(*(combo_pairs for _, combo_pairs in candidates))
+    chosen = []
+    while uncovered:
+        combo, combo_pairs = max(candidates, key=lambda c: len(c[1] & uncovered))
+        chosen.append(combo)
+        uncovered -= combo_pairs
+    return tuple(chosen)
+
+
+# Every pair of parameter values at least once, in a fraction of the 288
+PAIRWISE_COMBINATIONS = pairwise_combinations(
+    USE_CASES,
+    CLOUD_PLATFORMS,
+    INTEGRATION_PATTERNS,
+    DATA_CLASSIFICATIONS,
+    SCALE_TIERS,
+)
+_PAIRWISE_SET = frozenset(PAIRWISE_COMBINATIONS)
+
 # Representative subset for integration tests (24 combinations)
 # Uses PHI (most restrictive) and production (middle scale) for realistic testing
-REPRESENTATIVE_COMBINATIONS = list(
+REPRESENTATIVE_COMBINATIONS = tuple(
     product(
         USE_CASES,
         CLOUD_PLATFORMS,
@@ -54,7 +85,29 @@ REPRESENTATIVE_COMBINATIONS = list(
 )
 
 # Code generation combinations (8 = 4 use cases × 2 platforms)
-CODE_GEN_COMBINATIONS = list(product(USE_CASES, CLOUD_PLATFORMS))
+CODE_GEN_COMBINATIONS = tuple(product(USE_CASES, CLOUD_PLATFORMS))
+
+
+def pytest_collection_modifyitems(config, items):
+    """Without --exhaustive, trim exhaustive-marked tests to PAIRWISE_COMBINATIONS."""
+    if config.getoption("--exhaustive"):
+        return
+
+    selected, deselected = [], []
+    for item in items:
+        callspec = getattr(item, "callspec", None)
+        if (
+            item.get_closest_marker("exhaustive")
+            and callspec is not None
+            and callspec.params.get("combination") not in _PAIRWISE_SET
+        ):
+            deselected.append(item)
+        else:
+            selected.append(item)
+
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
 
 
 def combination_id(combo: tuple) -> str:
@@ -69,122 +122,56 @@ def code_gen_id(combo: tuple) -> str:
     return f"{use_case.value}-{platform.value}"
 
 
-@pytest.fixture
-def mock_claude_response_factory():
-    """
-    Factory fixture that creates mock Anthropic message responses.
-    """
-
-    def _create_mock(
-        use_case: UseCase,
-        cloud_platform: CloudPlatform,
-        integration_pattern: IntegrationPattern,
-        data_classification: DataClassification,
-        scale_tier: ScaleTier,
-        include_sample_code: bool = True,
-    ) -> MagicMock:
-        if include_sample_code:
-            response_data = generate_mock_architecture_response(
-                use_case,
-                cloud_platform,
-                integration_pattern,
-                data_classification,
-                scale_tier,
-            )
-        else:
-            response_data = generate_mock_streaming_response(
-                use_case,
-                cloud_platform,
-                integration_pattern,
-                data_classification,
-                scale_tier,
-            )
-
-        mock_message = MagicMock()
-        mock_message.stop_reason = "end_turn"
-        mock_message.content = [MagicMock(text=json.dumps(response_data))]
-        return mock_message
-
-    return _create_mock
+# Test IDs, built once and shared by every parametrize over the same tuple
+ALL_COMBINATION_IDS = tuple(combination_id(c) for c in ALL_COMBINATIONS)
+REPRESENTATIVE_IDS = tuple(combination_id(c) for c in REPRESENTATIVE_COMBINATIONS)
+CODE_GEN_IDS = tuple(code_gen_id(c) for c in CODE_GEN_COMBINATIONS)
 
 
-@pytest.fixture
-def mock_code_response_factory():
+@pytest.fixture(scope="session")
+def architecture_request_factory():
     """
-    Factory fixture for code generation responses.
+    Factory returning the ArchitectureRequest for a combination tuple,
+    validated once per session (do not mutate).
     """
-
-    def _create_mock(
-        use_case: UseCase,
-        cloud_platform: CloudPlatform,
-    ) -> MagicMock:
-        response_data = generate_mock_code_response(use_case, cloud_platform)
-
-        mock_message = MagicMock()
-        mock_message.stop_reason = "end_turn"
-        mock_message.content = [MagicMock(text=json.dumps(response_data))]
-        return mock_message
-
-    return _create_mock
-
-
-@pytest.fixture
-def architecture_request_factory():
-    """Factory to create ArchitectureRequest objects from combination tuples."""
+    built: dict[tuple, ArchitectureRequest] = {}
 
     def _create(combo: tuple) -> ArchitectureRequest:
-        use_case, platform, pattern, classification, scale = combo
-        return ArchitectureRequest(
-            use_case=use_case,
-            cloud_platform=platform,
-            integration_pattern=pattern,
-            data_classification=classification,
-            scale_tier=scale,
-        )
+        request = built.get(combo)
+        if request is None:
+            use_case, platform, pattern, classification, scale = combo
+            request = built[combo] = ArchitectureRequest(
+                use_case=use_case,
+                cloud_platform=platform,
+                integration_pattern=pattern,
+                data_classification=classification,
+                scale_tier=scale,
+            )
+        return request
 
     return _create
 
 
-class MockStreamContext:
-    """Mock context manager for Anthropic streaming responses."""
-
-    def __init__(self, response_text: str, chunk_size: int = 200):
-        self.response_text = response_text
-        self.chunk_size = chunk_size
-
-    def __enter__(self):
-        return self
+@pytest.fixture(scope="session")
+def parsed_response_factory():
+    """
+    Factory returning the mock architecture response for a combination as a
+    validated ArchitectureResponse, parsed once per session (do not mutate).
+    """
+    parsed: dict[tuple, ArchitectureResponse] = {}
 
-    def __exit__(self, *args):
-        pass
+    def _get(combo: tuple) -> ArchitectureResponse:
+        response = parsed.get(combo)
+        if response is None:
+            response = parsed[combo] = ArchitectureResponse.model_validate(
+                generate_mock_architecture_response(*combo)
+            )
+        return response
 
-    @property
-    def text_stream(self):
-        """Yield response in chunks to simulate streaming."""
-        for i in range(0, len(self.response_text), self.chunk_size):
-            yield self.response_text[i : i + self.chunk_size]
+    return _get
 
 
 @pytest.fixture
-def mock_stream_context_factory():
-    """
-    Factory fixture for creating streaming context managers.
-    """
-
-    def _create(
-        use_case: UseCase,
-        cloud_platform: CloudPlatform,
-        integration_pattern: IntegrationPattern,
-        data_classification: DataClassification,
-        scale_tier: ScaleTier,
-    ) -> MockStreamContext:
-        response_data = generate_mock_streaming_response(
-            use_case,
-            cloud_platform,
-            integration_pattern,
-            data_classification,
-            scale_tier,
-        )
-        return MockStreamContext(json.dumps(response_data))
-
-    return _create
+def parsed_response(request, parsed_response_factory) -> ArchitectureResponse:
+    """Parsed mock response for a combination passed with indirect=True."""
+    return parsed_response_factory(request.param)
@@ -2,7 +2,6 @@
 Tests for code generation endpoint with use case and platform combinations.
 """
 
-import asyncio
 import json
 from unittest.mock import MagicMock
 
@@ -15,7 +14,7 @@ from app.models import (
     UseCase,
 )
 from tests.fixtures.mock_responses import generate_mock_code_response
-from tests.test_scenarios.conftest import CODE_GEN_COMBINATIONS, code_gen_id
+from tests.test_scenarios.conftest import CODE_GEN_COMBINATIONS, CODE_GEN_IDS
 
 
 class TestCodeGenerationResponseValidation:
@@ -24,11 +23,12 @@ class TestCodeGenerationResponseValidation:
     @pytest.mark.parametrize(
         "combination",
         CODE_GEN_COMBINATIONS,
-        ids=[code_gen_id(c) for c in CODE_GEN_COMBINATIONS],
+        ids=CODE_GEN_IDS,
     )
     def test_code_response_parses_correctly(self, combination):
         """
-        Validate that code generation responses parse correctly.
+        Validate that code generation responses are well formed and parse
+        into the Pydantic model.
         """
         use_case, platform = combination
 
@@ -43,19 +43,6 @@ class TestCodeGenerationResponseValidation:
         assert len(mock_response_data["sampleCode"]["python"]) > 0
         assert len(mock_response_data["sampleCode"]["typescript"]) > 0
 
-    @pytest.mark.parametrize(
-        "combination",
-        CODE_GEN_COMBINATIONS,
-        ids=[code_gen_id(c) for c in CODE_GEN_COMBINATIONS],
-    )
-    def test_code_response_parses_to_pydantic_model(self, combination):
-        """
-        Validate that code responses parse into Pydantic model.
-        """
-        use_case, platform = combination
-
-        mock_response_data = generate_mock_code_response(use_case, platform)
-
         # Parse into model
         response = CodeGenerationResponse.model_validate(mock_response_data)
 
@@ -70,7 +57,7 @@ class TestPythonCodeContent:
     @pytest.mark.parametrize(
         "combination",
         CODE_GEN_COMBINATIONS,
-        ids=[code_gen_id(c) for c in CODE_GEN_COMBINATIONS],
+        ids=CODE_GEN_IDS,
     )
     def test_python_code_has_imports(self, combination):
         """
@@ -110,7 +97,7 @@ class TestTypeScriptCodeContent:
     @pytest.mark.parametrize(
         "combination",
         CODE_GEN_COMBINATIONS,
-        ids=[code_gen_id(c) for c in CODE_GEN_COMBINATIONS],
+        ids=CODE_GEN_IDS,
     )
     def test_typescript_code_has_imports(self, combination):
         """
@@ -150,10 +137,11 @@ class TestCodeGenerationWithMockedAPI:
     @pytest.mark.parametrize(
         "combination",
         CODE_GEN_COMBINATIONS,
-        ids=[code_gen_id(c) for c in CODE_GEN_COMBINATIONS],
+        ids=CODE_GEN_IDS,
     )
-    def test_code_generator_accepts_combination(
-        self, combination, mock_anthropic_client, mock_code_response_factory
+    @pytest.mark.asyncio(scope="module")
+    async def test_code_generator_accepts_combination(
+        self, combination, mock_anthropic_client, generator, mock_code_response_factory
     ):
         """
         Validate code generation for each use case and platform combination.
@@ -164,17 +152,13 @@ class TestCodeGenerationWithMockedAPI:
         mock_response = mock_code_response_factory(use_case, platform)
         mock_anthropic_client.messages.create.return_value = mock_response
 
-        from app.services.generator import ArchitectureGenerator
-
-        generator = ArchitectureGenerator("sk-ant-api03-test-key")
-
         request = CodeGenerationRequest(
             use_case=use_case,
             cloud_platform=platform,
             architecture_summary="Test architecture summary for code generation",
         )
 
-        response = asyncio.run(generator.generate_code(request))
+        response = await generator.generate_code(request)
 
         assert response is not None
         assert response.sample_code is not None
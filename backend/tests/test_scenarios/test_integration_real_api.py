@@ -9,18 +9,24 @@ These tests validate real API responses for:
 
 Run with: pytest -m integration tests/test_scenarios/test_integration_real_api.py -v
 
+Under pytest-xdist, add --dist loadgroup so the whole module stays on one
+worker and the responses are generated once rather than once per worker.
+
 Note: These tests require ANTHROPIC_API_KEY environment variable and will
-incur API costs (~$5-10 for full suite).
+incur API costs (~$5-10 for full suite). The first test to run generates all
+24 representative combinations at once, so even a single selected test makes
+24 calls.
 """
 
 import asyncio
-import json
 import os
+import re
 
+import anthropic
+import orjson
 import pytest
 
 from app.models import (
-    ArchitectureRequest,
     ArchitectureResponse,
     CloudPlatform,
     DataClassification,
@@ -28,24 +34,102 @@ from app.models import (
     ScaleTier,
     UseCase,
 )
+from app.services.generator import ArchitectureGenerator
 from tests.fixtures.response_storage import (
     save_response,
     validate_iam_policies,
     validate_mermaid_syntax,
     validate_response_structure,
 )
-from tests.test_scenarios.conftest import REPRESENTATIVE_COMBINATIONS, combination_id
+from tests.test_scenarios.conftest import REPRESENTATIVE_COMBINATIONS, REPRESENTATIVE_IDS
 
 
 # Skip all tests in this module if no API key is set
 pytestmark = [
     pytest.mark.integration,
+    pytest.mark.xdist_group("real_api"),
     pytest.mark.skipif(
         not os.environ.get("ANTHROPIC_API_KEY"),
         reason="ANTHROPIC_API_KEY not set - skipping integration tests",
     ),
 ]
 
+REAL_API_CONCURRENCY = 8  # Parallel calls, kept under the account's rate limit
+REAL_API_RETRIES = 2  # Extra rounds for combinations that hit a transient error
+REAL_API_RETRY_DELAY = 5.0  # Seconds before the first retry round, doubled after each
+TRANSIENT_ERROR_TYPES = frozenset({"overloaded_error", "api_error"})
+
+# Substring matches, as in the original keyword lists ("encrypt" matches "encryption")
+AWS_SERVICE_RE = re.compile(r"aws|amazon|bedrock|lambda|s3|dynamodb|sqs", re.IGNORECASE)
+GCP_SERVICE_RE = re.compile(r"cloud|gcp|google|vertex|firestore|pub/sub", re.IGNORECASE)
+ENCRYPTION_RE = re.compile(r"encrypt|kms|tls|ssl", re.IGNORECASE)
+
+
+def is_transient(error: object) -> bool:
+    """Whether a generate_many result is an API failure worth retrying.
+
+    Errors sent mid-stream (e.g. overloaded_error) arrive as a base
+    APIStatusError carrying the stream's 200 status, so the error type in
+    the body is checked as well as the status code.
+    """
+    if isinstance(error, anthropic.APIConnectionError):
+        return True
+    if not isinstance(error, anthropic.APIStatusError):
+        return False
+    if error.status_code == 429 or error.status_code >= 500:
+        return True
+    body = error.body if isinstance(error.body, dict) else {}
+    details = body.get("error")
+    error_type = details.get("type") if isinstance(details, dict) else body.get("type")
+    return error_type in TRANSIENT_ERROR_TYPES
+
+
+@pytest.fixture(scope="module")
+def real_responses(architecture_request_factory):
+    """Generate every representative combination once, concurrently.
+
+    All tests in this module check one of these 24 configurations, so they
+    share one generator (and its connection pool) and read from the result
+    instead of each awaiting its own call. Combinations that hit a transient
+    API error are retried on their own; any other failure maps to its exception.
+    """
+    requests = {combo: architecture_request_factory(combo) for combo in REPRESENTATIVE_COMBINATIONS}
+
+    async def generate_all():
+        results = {}
+        pending = list(requests)
+        generator = ArchitectureGenerator(os.environ["ANTHROPIC_API_KEY"])
+        try:
+            for attempt in range(1 + REAL_API_RETRIES):
+                if attempt:
+                    # Back off so retries don't land straight back in the overload
+                    await asyncio.sleep(REAL_API_RETRY_DELAY * 2 ** (attempt - 1))
+                batch = await generator.generate_many(
+                    [requests[combo] for combo in pending], concurrency=REAL_API_CONCURRENCY
+                )
+                results.update(zip(pending, batch))
+                pending = [combo for combo, result in zip(pending, batch) if is_transient(result)]
+                if not pending:
+                    break
+        finally:
+            await generator.aclose()
+        return results
+
+    return asyncio.run(generate_all())
+
+
+def real_response(real_responses, combination) -> ArchitectureResponse:
+    """Return the generated response for `combination`, re-raising its failure."""
+    response = real_responses[combination]
+    if isinstance(response, BaseException):
+        raise response
+    return response
+
+
+def phi_production_combination(use_case, platform) -> tuple:
+    """Representative combination for `use_case` on `platform` via API Gateway."""
+    return (use_case, platform, IntegrationPattern.API_GATEWAY, DataClassification.PHI, ScaleTier.PRODUCTION)
+
 
 class TestRealAPIIntegration:
     """
@@ -58,31 +142,17 @@ class TestRealAPIIntegration:
     @pytest.mark.parametrize(
         "combination",
         REPRESENTATIVE_COMBINATIONS,
-        ids=[combination_id(c) for c in REPRESENTATIVE_COMBINATIONS],
+        ids=REPRESENTATIVE_IDS,
     )
-    @pytest.mark.asyncio
-    async def test_real_api_response_is_valid(self, combination):
+    def test_real_api_response_is_valid(self, combination, real_responses):
         """
         Test that real API responses parse correctly and have valid structure.
         """
         use_case, platform, pattern, classification, scale = combination
 
-        from app.services.generator import ArchitectureGenerator
-
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        generator = ArchitectureGenerator(api_key)
-
-        request = ArchitectureRequest(
-            use_case=use_case,
-            cloud_platform=platform,
-            integration_pattern=pattern,
-            data_classification=classification,
-            scale_tier=scale,
-        )
-
         # Call real API
         try:
-            response = await generator.generate(request)
+            response = real_response(real_responses, combination)
             response_dict = response.model_dump(by_alias=True)
 
             # Validate response structure
@@ -126,29 +196,15 @@ class TestRealAPIIntegration:
     @pytest.mark.parametrize(
         "combination",
         REPRESENTATIVE_COMBINATIONS,
-        ids=[combination_id(c) for c in REPRESENTATIVE_COMBINATIONS],
+        ids=REPRESENTATIVE_IDS,
     )
-    @pytest.mark.asyncio
-    async def test_real_api_mermaid_syntax(self, combination):
+    def test_real_api_mermaid_syntax(self, combination, real_responses):
         """
         Test that real API Mermaid diagrams have valid syntax.
         """
         use_case, platform, pattern, classification, scale = combination
 
-        from app.services.generator import ArchitectureGenerator
-
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        generator = ArchitectureGenerator(api_key)
-
-        request = ArchitectureRequest(
-            use_case=use_case,
-            cloud_platform=platform,
-            integration_pattern=pattern,
-            data_classification=classification,
-            scale_tier=scale,
-        )
-
-        response = await generator.generate(request)
+        response = real_response(real_responses, combination)
         diagram = response.architecture.mermaid_diagram
 
         # Validate Mermaid syntax
@@ -172,29 +228,15 @@ class TestRealAPIIntegration:
     @pytest.mark.parametrize(
         "combination",
         REPRESENTATIVE_COMBINATIONS,
-        ids=[combination_id(c) for c in REPRESENTATIVE_COMBINATIONS],
+        ids=REPRESENTATIVE_IDS,
     )
-    @pytest.mark.asyncio
-    async def test_real_api_iam_policies(self, combination):
+    def test_real_api_iam_policies(self, combination, real_responses):
         """
         Test that real API IAM policies are valid JSON with correct structure.
         """
         use_case, platform, pattern, classification, scale = combination
 
-        from app.services.generator import ArchitectureGenerator
-
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        generator = ArchitectureGenerator(api_key)
-
-        request = ArchitectureRequest(
-            use_case=use_case,
-            cloud_platform=platform,
-            integration_pattern=pattern,
-            data_classification=classification,
-            scale_tier=scale,
-        )
-
-        response = await generator.generate(request)
+        response = real_response(real_responses, combination)
         iam_policies = response.deployment.iam_policies
 
         # Validate IAM policies
@@ -218,38 +260,16 @@ class TestRealAPIIntegration:
     @pytest.mark.parametrize(
         "combination",
         REPRESENTATIVE_COMBINATIONS,
-        ids=[combination_id(c) for c in REPRESENTATIVE_COMBINATIONS],
+        ids=REPRESENTATIVE_IDS,
     )
-    @pytest.mark.asyncio
-    async def test_real_api_json_serialization(self, combination):
+    def test_real_api_json_serialization(self, combination, real_responses):
         """
         Test that real API responses serialize to valid JSON.
         """
-        use_case, platform, pattern, classification, scale = combination
+        response = real_response(real_responses, combination)
 
-        from app.services.generator import ArchitectureGenerator
-
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        generator = ArchitectureGenerator(api_key)
-
-        request = ArchitectureRequest(
-            use_case=use_case,
-            cloud_platform=platform,
-            integration_pattern=pattern,
-            data_classification=classification,
-            scale_tier=scale,
-        )
-
-        response = await generator.generate(request)
-
-        # Convert to dict and serialize to JSON
-        response_dict = response.model_dump(by_alias=True)
-        json_str = json.dumps(response_dict)
-
-        # Parse back and verify
-        parsed = json.loads(json_str)
-
-        assert parsed == response_dict, "JSON serialization round-trip failed"
+        # Parsing proves the output is valid JSON; the key checks cover aliasing
+        parsed = orjson.loads(response.model_dump_json(by_alias=True))
 
         # Verify camelCase aliases
         assert "sampleCode" in parsed
@@ -265,64 +285,32 @@ class TestRealAPICloudPlatformContent:
     """
 
     @pytest.mark.parametrize("use_case", list(UseCase))
-    @pytest.mark.asyncio
-    async def test_aws_responses_contain_aws_services(self, use_case):
+    def test_aws_responses_contain_aws_services(self, use_case, real_responses):
         """
         Test that AWS platform responses mention AWS-specific services.
         """
-        from app.services.generator import ArchitectureGenerator
-
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        generator = ArchitectureGenerator(api_key)
-
-        request = ArchitectureRequest(
-            use_case=use_case,
-            cloud_platform=CloudPlatform.AWS_BEDROCK,
-            integration_pattern=IntegrationPattern.API_GATEWAY,
-            data_classification=DataClassification.PHI,
-            scale_tier=ScaleTier.PRODUCTION,
-        )
-
-        response = await generator.generate(request)
+        combination = phi_production_combination(use_case, CloudPlatform.AWS_BEDROCK)
+        response = real_response(real_responses, combination)
 
         # Check components mention AWS services
-        all_services = [c.service.lower() for c in response.architecture.components]
+        all_services = [c.service for c in response.architecture.components]
         services_str = " ".join(all_services)
 
-        aws_keywords = ["aws", "amazon", "bedrock", "lambda", "s3", "dynamodb", "sqs"]
-        has_aws_service = any(kw in services_str for kw in aws_keywords)
-
-        assert has_aws_service, f"AWS response should mention AWS services, got: {all_services}"
+        assert AWS_SERVICE_RE.search(services_str), f"AWS response should mention AWS services, got: {all_services}"
 
     @pytest.mark.parametrize("use_case", list(UseCase))
-    @pytest.mark.asyncio
-    async def test_gcp_responses_contain_gcp_services(self, use_case):
+    def test_gcp_responses_contain_gcp_services(self, use_case, real_responses):
         """
         Test that GCP platform responses mention GCP-specific services.
         """
-        from app.services.generator import ArchitectureGenerator
-
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        generator = ArchitectureGenerator(api_key)
-
-        request = ArchitectureRequest(
-            use_case=use_case,
-            cloud_platform=CloudPlatform.GCP_VERTEX,
-            integration_pattern=IntegrationPattern.API_GATEWAY,
-            data_classification=DataClassification.PHI,
-            scale_tier=ScaleTier.PRODUCTION,
-        )
-
-        response = await generator.generate(request)
+        combination = phi_production_combination(use_case, CloudPlatform.GCP_VERTEX)
+        response = real_response(real_responses, combination)
 
         # Check components mention GCP services
-        all_services = [c.service.lower() for c in response.architecture.components]
+        all_services = [c.service for c in response.architecture.components]
         services_str = " ".join(all_services)
 
-        gcp_keywords = ["cloud", "gcp", "google", "vertex", "firestore", "pub/sub"]
-        has_gcp_service = any(kw in services_str for kw in gcp_keywords)
-
-        assert has_gcp_service, f"GCP response should mention GCP services, got: {all_services}"
+        assert GCP_SERVICE_RE.search(services_str), f"GCP response should mention GCP services, got: {all_services}"
 
 
 class TestRealAPIPHIHandling:
@@ -331,25 +319,12 @@ class TestRealAPIPHIHandling:
     """
 
     @pytest.mark.parametrize("use_case", list(UseCase))
-    @pytest.mark.asyncio
-    async def test_phi_classification_has_phi_touchpoints(self, use_case):
+    def test_phi_classification_has_phi_touchpoints(self, use_case, real_responses):
         """
         Test that PHI data classification results in PHI touchpoints.
         """
-        from app.services.generator import ArchitectureGenerator
-
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        generator = ArchitectureGenerator(api_key)
-
-        request = ArchitectureRequest(
-            use_case=use_case,
-            cloud_platform=CloudPlatform.AWS_BEDROCK,
-            integration_pattern=IntegrationPattern.API_GATEWAY,
-            data_classification=DataClassification.PHI,
-            scale_tier=ScaleTier.PRODUCTION,
-        )
-
-        response = await generator.generate(request)
+        combination = phi_production_combination(use_case, CloudPlatform.AWS_BEDROCK)
+        response = real_response(real_responses, combination)
 
         # PHI classification should have some components marked as PHI touchpoints
         phi_touchpoints = [c for c in response.architecture.components if c.phi_touchpoint]
@@ -360,35 +335,17 @@ class TestRealAPIPHIHandling:
         )
 
     @pytest.mark.parametrize("use_case", list(UseCase))
-    @pytest.mark.asyncio
-    async def test_phi_classification_has_encryption_requirements(self, use_case):
+    def test_phi_classification_has_encryption_requirements(self, use_case, real_responses):
         """
         Test that PHI data classification includes encryption requirements.
         """
-        from app.services.generator import ArchitectureGenerator
-
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        generator = ArchitectureGenerator(api_key)
-
-        request = ArchitectureRequest(
-            use_case=use_case,
-            cloud_platform=CloudPlatform.AWS_BEDROCK,
-            integration_pattern=IntegrationPattern.API_GATEWAY,
-            data_classification=DataClassification.PHI,
-            scale_tier=ScaleTier.PRODUCTION,
-        )
-
-        response = await generator.generate(request)
+        combination = phi_production_combination(use_case, CloudPlatform.AWS_BEDROCK)
+        response = real_response(real_responses, combination)
 
         # Check compliance checklist mentions encryption
-        checklist_text = " ".join(
-            [item.requirement.lower() + " " + item.implementation.lower() for item in response.compliance.checklist]
-        )
-
-        encryption_keywords = ["encrypt", "kms", "tls", "ssl"]
-        has_encryption = any(kw in checklist_text for kw in encryption_keywords)
+        checklist_text = " ".join(f"{item.requirement} {item.implementation}" for item in response.compliance.checklist)
 
-        assert has_encryption, (
+        assert ENCRYPTION_RE.search(checklist_text), (
             f"PHI compliance should mention encryption. "
             f"Checklist: {[item.requirement for item in response.compliance.checklist]}"
         )
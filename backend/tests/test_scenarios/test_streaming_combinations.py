@@ -3,26 +3,31 @@ Tests for streaming architecture generation endpoint with all combinations.
 """
 
 import json
+import re
 from unittest.mock import MagicMock, patch
 
+import orjson
 import pytest
 
 from app.models import (
-    ArchitectureRequest,
     CloudPlatform,
     DataClassification,
     IntegrationPattern,
     ScaleTier,
     UseCase,
 )
+from tests.conftest import MockStreamContext
 from tests.fixtures.mock_responses import generate_mock_streaming_response
 from tests.test_scenarios.conftest import (
+    ALL_COMBINATION_IDS,
     ALL_COMBINATIONS,
     REPRESENTATIVE_COMBINATIONS,
-    MockStreamContext,
-    combination_id,
+    REPRESENTATIVE_IDS,
 )
 
+# Mermaid edge "source[label] --> target", capturing the two node ids
+MERMAID_EDGE_RE = re.compile(r"([A-Za-z_]\w*)\s*(?:\[[^\]]*\])?\s*-->\s*([A-Za-z_]\w*)")
+
 
 class TestStreamingResponseValidation:
     """Tests that validate streaming response format for all combinations."""
@@ -30,7 +35,7 @@ class TestStreamingResponseValidation:
     @pytest.mark.parametrize(
         "combination",
         ALL_COMBINATIONS,
-        ids=[combination_id(c) for c in ALL_COMBINATIONS],
+        ids=ALL_COMBINATION_IDS,
     )
     def test_streaming_response_parses_correctly(self, combination):
         """
@@ -67,7 +72,7 @@ class TestStreamingResponseValidation:
     @pytest.mark.parametrize(
         "combination",
         ALL_COMBINATIONS,
-        ids=[combination_id(c) for c in ALL_COMBINATIONS],
+        ids=ALL_COMBINATION_IDS,
     )
     def test_streaming_response_is_valid_json(self, combination):
         """
@@ -94,11 +99,16 @@ class TestStreamingWithMockedAPI:
     @pytest.mark.parametrize(
         "combination",
         REPRESENTATIVE_COMBINATIONS,
-        ids=[combination_id(c) for c in REPRESENTATIVE_COMBINATIONS],
+        ids=REPRESENTATIVE_IDS,
     )
     @pytest.mark.asyncio
     async def test_streaming_generator_accepts_combination(
-        self, combination, mock_anthropic_client, mock_stream_context_factory
+        self,
+        combination,
+        mock_anthropic_client,
+        generator,
+        mock_stream_context_factory,
+        architecture_request_factory,
     ):
         """
         Validate streaming generation for representative combinations.
@@ -111,17 +121,7 @@ class TestStreamingWithMockedAPI:
         )
         mock_anthropic_client.messages.stream.return_value = mock_stream
 
-        from app.services.generator import ArchitectureGenerator
-
-        generator = ArchitectureGenerator("sk-ant-api03-test-key")
-
-        request = ArchitectureRequest(
-            use_case=use_case,
-            cloud_platform=platform,
-            integration_pattern=pattern,
-            data_classification=classification,
-            scale_tier=scale,
-        )
+        request = architecture_request_factory(combination)
 
         # Collect all events from the stream
         events = []
@@ -131,10 +131,8 @@ class TestStreamingWithMockedAPI:
         # Validate events were generated
         assert len(events) > 0
 
-        # Should have progress events
-        event_types = [e.get("event") for e in events if "event" in e]
-        # At minimum, should have some events emitted
-        assert len(event_types) >= 0 or len(events) > 0
+        # Every event should be an encoded SSE frame
+        assert all(e.startswith(b"event: ") and e.endswith(b"\r\n\r\n") for e in events)
 
 
 class TestMermaidDiagramValidation:
@@ -143,7 +141,7 @@ class TestMermaidDiagramValidation:
     @pytest.mark.parametrize(
         "combination",
         REPRESENTATIVE_COMBINATIONS,
-        ids=[combination_id(c) for c in REPRESENTATIVE_COMBINATIONS],
+        ids=REPRESENTATIVE_IDS,
     )
     def test_mermaid_diagram_has_valid_syntax(self, combination):
         """
@@ -164,14 +162,8 @@ class TestMermaidDiagramValidation:
         assert "-->" in diagram or "---" in diagram
 
         # Should not have self-referential links (common error)
-        lines = diagram.split("\n")
-        for line in lines:
-            if "-->" in line:
-                parts = line.split("-->")
-                if len(parts) == 2:
-                    source = parts[0].strip().split("[")[0].strip()
-                    target = parts[1].strip().split("[")[0].strip()
-                    assert source != target, f"Self-referential link found: {source}"
+        for source, target in MERMAID_EDGE_RE.findall(diagram):
+            assert source != target, f"Self-referential link found: {source}"
 
 
 class TestIAMPolicyValidation:
@@ -180,7 +172,7 @@ class TestIAMPolicyValidation:
     @pytest.mark.parametrize(
         "combination",
         REPRESENTATIVE_COMBINATIONS,
-        ids=[combination_id(c) for c in REPRESENTATIVE_COMBINATIONS],
+        ids=REPRESENTATIVE_IDS,
     )
     def test_iam_policies_are_valid_json(self, combination):
         """
@@ -197,7 +189,7 @@ class TestIAMPolicyValidation:
 
         for policy in iam_policies:
             # Each policy should be a valid JSON string
-            parsed = json.loads(policy)
+            parsed = orjson.loads(policy)
             assert isinstance(parsed, dict)
 
     @pytest.mark.parametrize("platform", list(CloudPlatform))
@@ -217,13 +209,13 @@ class TestIAMPolicyValidation:
 
         if platform == CloudPlatform.AWS_BEDROCK:
             for policy_str in iam_policies:
-                policy = json.loads(policy_str)
+                policy = orjson.loads(policy_str)
                 assert "Version" in policy, "AWS IAM policy should have Version"
                 assert "Statement" in policy, "AWS IAM policy should have Statement"
                 assert isinstance(policy["Statement"], list)
         else:
             # GCP uses bindings format
             for policy_str in iam_policies:
-                policy = json.loads(policy_str)
+                policy = orjson.loads(policy_str)
                 assert "bindings" in policy, "GCP IAM policy should have bindings"
                 assert isinstance(policy["bindings"], list)